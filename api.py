@@ -0,0 +1,421 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+
+import strategy_core
+import providers
+import universe
+
+# =========================================================
+# 🛰️ LOCAL HTTP API
+# =========================================================
+# The dashboard's numbers as JSON over HTTP (standard library server):
+#   GET  /health
+#   GET  /backtest?symbol=TQQQ[&ma_period=200&stop_loss=0.15...]  metrics + trades
+#   GET  /diagnosis?symbol=TQQQ[&...]                              live diagnosis
+#   GET  /curve?symbol=TQQQ[&format=json|csv]                      equity curve, streamed
+#   GET  /batch?symbols=TQQQ,SOXL[&...]                            universe summary rows
+#   POST /batch  {"symbols": [...], "params": {...}}
+# Strategy params are DEFAULT_PARAMS keys (+ interval / htf_rule) as query args.
+# Malformed or out-of-range params and symbols are a 400 (BadRequest); a symbol
+# without data or without bars after start_date / the warm-up is a 404.
+#
+# Every response carries an ETag (endpoint + params + whole price-series
+# fingerprint) and Last-Modified (last bar), so polling clients get a 304 without a
+# backtest. JSON bodies are kept in a small LRU keyed by ETag; backtests go
+# through the result cache with the same (engine, output) the dashboard and
+# prewarm.py use. Data loads and backtests run on a bounded worker pool.
+#
+# Offline: python api.py --provider local:./data  (or TQ_PROVIDER=local:./data)
+
+HOST = os.environ.get('TQ_API_HOST', '127.0.0.1')
+PORT = int(os.environ.get('TQ_API_PORT', 8765))
+API_WORKERS = int(os.environ.get('TQ_API_WORKERS', os.cpu_count() or 1))
+REQUEST_TIMEOUT = 120         # Seconds a request waits for the pool before a 503
+RESPONSE_CACHE_ENTRIES = 256
+CURVE_CHUNK_ROWS = 1000       # Rows per streamed chunk
+MAX_BATCH = 500
+ENGINE, OUTPUT = 'vectorized', 'columnar'
+CURVE_COLS = ['equity', 'price', 'ma', 'rsi_w', 'rsi_d']
+EXTRA_PARAMS = ['interval', 'htf_rule']
+RESERVED_ARGS = ['symbol', 'symbols', 'format']
+PERIOD_PARAMS = ['ma_period', 'd_period', 'w_period']
+RSI_PARAMS = ['w_buy_max', 'd_buy_cross', 'w_sell_cross', 'w_profit_max']
+SYMBOL_RE = re.compile(r'^[A-Z0-9.\-^=]{1,15}$')
+
+_responses = collections.OrderedDict()   # ETag -> encoded JSON body
+_versions = collections.OrderedDict()    # (endpoint, params, symbols) -> latest (ETag, Last-Modified)
+_responses_lock = threading.Lock()
+
+
+class BadRequest(Exception):
+    # Invalid client input -> 400 (other exceptions keep their own status)
+    pass
+
+def _default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+def _encode(obj):
+    return json.dumps(obj, default=_default, ensure_ascii=False).encode('utf-8')
+
+def _cast(key, value, default):
+    # Strict conversion to the type of the DEFAULT_PARAMS value; BadRequest otherwise
+    text = str(value).strip()
+    if isinstance(default, bool):
+        if text.lower() in ('1', 'true', 'yes', 'on'):
+            return True
+        if text.lower() in ('0', 'false', 'no', 'off'):
+            return False
+    elif isinstance(default, int):
+        if not isinstance(value, (bool, float)) and text.lstrip('+-').isdigit():
+            return int(text)
+    elif isinstance(default, float):
+        if not isinstance(value, bool):
+            try:
+                number = float(text)
+            except ValueError:
+                pass
+            else:
+                if np.isfinite(number):
+                    return number
+    else:
+        return text
+    raise BadRequest(f"Invalid {type(default).__name__} for {key}: {value!r}")
+
+def _check_range(params):
+    # Values the engine can run: periods >= 1, RSI levels 0..100, 0 < stop_loss < 1
+    for key in PERIOD_PARAMS:
+        if params[key] < 1:
+            raise BadRequest(f"{key} must be a positive integer: {params[key]}")
+    for key in RSI_PARAMS:
+        if not 0 <= params[key] <= 100:
+            raise BadRequest(f"{key} must be within 0..100: {params[key]}")
+    if not 0 < params['stop_loss'] < 1:
+        raise BadRequest(f"stop_loss must be within (0, 1): {params['stop_loss']}")
+
+def parse_params(args):
+    # {name: [value, ...]} (parse_qs layout) -> strategy params; BadRequest on bad input
+    params = dict(strategy_core.DEFAULT_PARAMS)
+    for key, values in args.items():
+        if key in RESERVED_ARGS:
+            continue
+        value = values[-1]
+        if key in EXTRA_PARAMS:
+            params[key] = str(value)
+        elif key in strategy_core.DEFAULT_PARAMS:
+            params[key] = _cast(key, value, strategy_core.DEFAULT_PARAMS[key])
+        else:
+            raise BadRequest(f"Unknown parameter: {key}")
+    _check_range(params)
+    try:
+        providers.check_interval(params.get('interval', '1d'))
+        if params.get('htf_rule'):
+            pd.tseries.frequencies.to_offset(params['htf_rule'])
+        params['start_date'] = pd.Timestamp(params['start_date']).strftime('%Y-%m-%d')
+    except ValueError as e:
+        raise BadRequest(str(e)) from None
+    return params
+
+def _check_symbol(symbol):
+    # Tickers only: the name ends up in cache / local-provider file paths
+    if not SYMBOL_RE.match(symbol):
+        raise BadRequest(f"Invalid symbol: {symbol!r}")
+    return symbol
+
+def _symbol(args):
+    symbol = args.get('symbol', [''])[-1].strip().upper()
+    if not symbol:
+        raise BadRequest("Missing 'symbol'")
+    return _check_symbol(symbol)
+
+def _validators(endpoint, params, frames):
+    # frames: {symbol: price frame}. The ETag (also the response-cache key)
+    # covers the whole-series fingerprint of every frame (strategy_core._data_key),
+    # so rewritten history never matches an old ETag. Last-Modified is the newest
+    # last bar (None without data), or the time a rewrite was first seen if the
+    # data changed without a new bar.
+    base = repr((endpoint, strategy_core._param_key(params), sorted(frames)))
+    keys = sorted((s, strategy_core._data_key(df)) for s, df in frames.items() if not df.empty)
+    etag = '"%s"' % hashlib.sha1(repr((base, keys)).encode()).hexdigest()[:24]
+    last = max((df.index[-1] for df in frames.values() if not df.empty), default=None)
+    with _responses_lock:
+        prev = _versions.get(base)
+        if prev is not None and prev[0] == etag:
+            last = prev[1]
+        elif prev is not None and last is not None and prev[1] is not None and last <= prev[1]:
+            last = pd.Timestamp.now(tz='UTC').tz_localize(None).floor('s')
+        _versions[base] = (etag, last)
+        _versions.move_to_end(base)
+        while len(_versions) > RESPONSE_CACHE_ENTRIES:
+            _versions.popitem(last=False)
+    return etag, last
+
+def _cached_body(etag, build):
+    with _responses_lock:
+        body = _responses.get(etag)
+        if body is not None:
+            _responses.move_to_end(etag)
+            return body
+    body = build()
+    with _responses_lock:
+        _responses[etag] = body
+        while len(_responses) > RESPONSE_CACHE_ENTRIES:
+            _responses.popitem(last=False)
+    return body
+
+# ---------------------------------------------------------
+# Work (runs on the server's worker pool)
+# ---------------------------------------------------------
+def _load(provider, symbol, params):
+    return strategy_core.get_data(symbol, params['start_date'], provider=provider,
+                                  interval=params.get('interval', '1d'))
+
+def _load_many(provider, symbols, params):
+    return strategy_core.get_data_many(symbols, params['start_date'], provider=provider,
+                                       interval=params.get('interval', '1d'))
+
+def _strategy(symbol, params, df):
+    result = strategy_core.get_strategy_data(symbol, params, engine=ENGINE, output=OUTPUT, df_raw=df)
+    if 'error' in result:
+        raise LookupError(result['error'])
+    return result
+
+def _summary(result):
+    return {k: v for k, v in result.items() if k not in ('equity_curve', 'timings')}
+
+def curve_chunks(curve, fmt='json', rows=CURVE_CHUNK_ROWS):
+    # Columnar curve -> encoded pieces of one JSON array / CSV document
+    # (values rounded and row-0 RSIs zeroed like output='records', both formats)
+    dates = pd.DatetimeIndex(curve['date'])
+    dates = list(dates.strftime(strategy_core._date_format(dates)))
+    yield (','.join(['date'] + CURVE_COLS + ['s']) + '\n').encode() if fmt == 'csv' else b'['
+    for lo in range(0, len(dates), rows):
+        cols = [np.round(curve[c][lo:lo + rows], 2).tolist() for c in CURVE_COLS]
+        if lo == 0 and cols[0]:
+            cols[CURVE_COLS.index('rsi_w')][0] = cols[CURVE_COLS.index('rsi_d')][0] = 0
+        recs = zip(dates[lo:lo + rows], *cols, curve['s'][lo:lo + rows].tolist())
+        if fmt == 'csv':
+            yield ''.join(','.join(map(str, r)) + '\n' for r in recs).encode()
+        else:
+            piece = _encode([dict(zip(['date'] + CURVE_COLS + ['s'], r)) for r in recs])[1:-1]
+            yield piece if lo == 0 else b',' + piece
+    if fmt != 'csv':
+        yield b']'
+
+# ---------------------------------------------------------
+# Endpoints: (handler, query args, JSON body or None)
+# ---------------------------------------------------------
+def _prepare(h, endpoint, args):
+    symbol, params = _symbol(args), parse_params(args)
+    df = h.run(_load, h.server.provider, symbol, params)
+    if df.empty:
+        raise LookupError(f"No data for {symbol}")
+    if df.index[-1] < pd.Timestamp(params['start_date']):
+        raise LookupError(f"No bars for {symbol} since {params['start_date']}")
+    etag, last = _validators(endpoint, params, {symbol: df})
+    return symbol, params, df, etag, last
+
+def health(h, args, body):
+    h.send_json(200, {
+        "status": "ok",
+        "provider": providers.get_provider(h.server.provider)['name'],
+        "workers": h.server.workers,
+        "response_cache": len(_responses),
+        "result_cache": strategy_core.result_cache_stats(),
+    })
+
+def backtest(h, args, body):
+    symbol, params, df, etag, last = _prepare(h, 'backtest', args)
+    if not h.not_modified(etag, last):
+        h.send_body(200, _cached_body(etag, lambda: _encode(_summary(h.run(_strategy, symbol, params, df)))),
+                    etag, last)
+
+def diagnosis(h, args, body):
+    symbol, params, df, etag, last = _prepare(h, 'diagnosis', args)
+    if not h.not_modified(etag, last):
+        def build():
+            result = h.run(_strategy, symbol, params, df)
+            return _encode({k: result[k] for k in ('symbol', 'last_date', 'diagnosis')})
+        h.send_body(200, _cached_body(etag, build), etag, last)
+
+def curve(h, args, body):
+    fmt = args.get('format', ['json'])[-1]
+    if fmt not in ('json', 'csv'):
+        raise BadRequest(f"Unknown format: {fmt}")
+    symbol, params, df, etag, last = _prepare(h, 'curve:' + fmt, args)
+    if not h.not_modified(etag, last):
+        result = h.run(_strategy, symbol, params, df)
+        h.send_stream(curve_chunks(result['equity_curve'], fmt), etag, last,
+                      'text/csv; charset=utf-8' if fmt == 'csv' else 'application/json')
+
+def batch(h, args, body):
+    if body is not None:
+        symbols = body.get('symbols') or []
+        if not isinstance(body.get('params') or {}, dict):
+            raise BadRequest("'params' must be an object")
+        params = parse_params({k: [v] for k, v in (body.get('params') or {}).items()})
+    else:
+        symbols = args.get('symbols', [''])[-1].split(',')
+        params = parse_params(args)
+    if not isinstance(symbols, list):
+        raise BadRequest("'symbols' must be a list")
+    symbols = list(dict.fromkeys(str(s).strip().upper() for s in symbols if str(s).strip()))
+    if not symbols:
+        raise BadRequest("Missing 'symbols'")
+    if len(symbols) > MAX_BATCH:
+        raise BadRequest(f"At most {MAX_BATCH} symbols per batch")
+    for s in symbols:
+        _check_symbol(s)
+    data = h.run(_load_many, h.server.provider, symbols, params)
+    etag, last = _validators('batch', params, data)
+    if not h.not_modified(etag, last):
+        def build():
+            futures = [h.server.pool.submit(universe._run_one, s, data.get(s), params, ENGINE) for s in symbols]
+            return _encode([f.result(timeout=REQUEST_TIMEOUT) for f in futures])
+        h.send_body(200, _cached_body(etag, build), etag, last)
+
+ROUTES = {
+    ('GET', '/health'): health,
+    ('GET', '/backtest'): backtest,
+    ('GET', '/diagnosis'): diagnosis,
+    ('GET', '/curve'): curve,
+    ('GET', '/batch'): batch,
+    ('POST', '/batch'): batch,
+}
+
+# ---------------------------------------------------------
+# Server
+# ---------------------------------------------------------
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'tq-api'
+
+    def do_GET(self):
+        self.dispatch('GET', None)
+
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        except ValueError:
+            return self.send_json(400, {"error": "Body must be JSON"})
+        if not isinstance(body, dict):
+            return self.send_json(400, {"error": "Body must be a JSON object"})
+        self.dispatch('POST', body)
+
+    def dispatch(self, method, body):
+        url = urlsplit(self.path)
+        route = ROUTES.get((method, url.path))
+        if route is None:
+            return self.send_json(404, {"error": f"Unknown endpoint: {method} {url.path}"})
+        self.started = False
+        try:
+            route(self, parse_qs(url.query), body)
+        except Exception as e:
+            if self.started:
+                # Mid-stream: the client sees a truncated body
+                self.close_connection = True
+                return
+            if isinstance(e, TimeoutError):
+                self.send_json(503, {"error": "Server busy, retry later"}, {'Retry-After': '5'})
+            elif isinstance(e, BadRequest):
+                self.send_json(400, {"error": str(e)})
+            elif isinstance(e, LookupError) and not isinstance(e, KeyError):
+                self.send_json(404, {"error": str(e)})
+            else:
+                self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def run(self, fn, *args):
+        # Bounded concurrency: every data load / backtest goes through the pool
+        return self.server.pool.submit(fn, *args).result(timeout=REQUEST_TIMEOUT)
+
+    def _validator_headers(self, etag, last):
+        self.send_header('ETag', etag)
+        if last is not None:
+            self.send_header('Last-Modified', formatdate(pd.Timestamp(last).timestamp(), usegmt=True))
+        self.send_header('Cache-Control', 'no-cache')
+
+    def not_modified(self, etag, last):
+        # If-None-Match wins over If-Modified-Since (RFC 9110); sends the 304 itself
+        match = self.headers.get('If-None-Match')
+        since = self.headers.get('If-Modified-Since')
+        if match is not None:
+            fresh = match.strip() == '*' or etag in [t.strip() for t in match.split(',')]
+        elif since is not None and last is not None:
+            try:
+                fresh = pd.Timestamp(last).timestamp() <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                fresh = False
+        else:
+            fresh = False
+        if fresh:
+            self.send_response(304)
+            self._validator_headers(etag, last)
+            self.end_headers()
+        return fresh
+
+    def send_body(self, status, body, etag=None, last=None, headers=None, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self._validator_headers(etag, last)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, obj, headers=None):
+        self.send_body(status, _encode(obj), headers=headers)
+
+    def send_stream(self, chunks, etag, last, content_type):
+        # Chunked transfer encoding: rows go out as they're formatted
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self._validator_headers(etag, last)
+        self.end_headers()
+        self.started = True
+        for piece in chunks:
+            if piece:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(piece), piece))
+        self.wfile.write(b'0\r\n\r\n')
+
+def make_server(host=HOST, port=PORT, provider=None, workers=API_WORKERS):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.provider = provider
+    server.workers = workers
+    server.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve strategy_core over HTTP')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=API_WORKERS)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.provider, args.workers)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} "
+          f"({providers.get_provider(args.provider)['name']}, {args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown(cancel_futures=True)
@@ -0,0 +1,150 @@
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import strategy_core
+import trade_log
+
+# =========================================================
+# 📦 BACKTEST ARTIFACTS (Arrow / Parquet)
+# =========================================================
+# get_strategy_data() outputs as Arrow tables and Parquet files, so sweep
+# results can be archived once and read back (memory-mapped) instead of
+# re-running the backtest:
+#   equity_curve.parquet  - date, equity, price, ma, rsi_w, rsi_d, s
+#   trades.parquet        - trade_log.LOG_COLS
+#   indicators.parquet    - calculate_indicators() columns (optional)
+# compact=True stores float32 values, int8 status / categories and date32
+# (int32 days) dates. Compact curve arrays become Arrow columns without a copy.
+# Summary metrics travel in the Parquet schema metadata (META_KEY).
+
+META_KEY = b'tq'
+CURVE_COLS = ['equity', 'price', 'ma', 'rsi_w', 'rsi_d']
+INDICATOR_COLS = ['Close', 'MA', 'RSI_D', 'RSI_W']
+ARTIFACTS = ['equity_curve', 'trades', 'indicators']
+
+
+def _dates(dates, compact):
+    # datetime64 -> date32 for daily bars (compact), else timestamp[ns]
+    ns = np.asarray(dates, dtype='datetime64[ns]')
+    if compact and not (ns.view('int64') % 86_400_000_000_000).any():
+        return pa.array(ns.astype('datetime64[D]').astype(np.int32)).view(pa.date32())
+    return pa.array(ns)
+
+def curve_table(curve, compact=True):
+    # Equity curve in any output mode (records / columnar / compact) -> Arrow table
+    if isinstance(curve, list):
+        columns = {"date": pd.to_datetime([e['date'] for e in curve]).values}
+        columns.update({c: np.array([e[c] for e in curve], dtype='float64') for c in CURVE_COLS})
+        columns['s'] = np.array([e['s'] for e in curve], dtype=np.int8)
+        curve = columns
+    if 'day' in curve:
+        if 'minute' in curve:
+            date = _dates(strategy_core.compact_dates(curve), compact)
+        else:
+            # Already the date32 layout: zero-copy view
+            date = pa.array(curve['day']).view(pa.date32())
+    else:
+        date = _dates(curve['date'], compact)
+    dtype = np.float32 if compact else np.float64
+    arrays = [date] + [pa.array(curve[c].astype(dtype, copy=False)) for c in CURVE_COLS]
+    arrays.append(pa.array(curve['s'].astype(np.int8, copy=False)))
+    return pa.Table.from_arrays(arrays, names=['date'] + CURVE_COLS + ['s'])
+
+def trades_table(trades, compact=True):
+    # List of trade dicts (any order) -> chronological Arrow table
+    df = trade_log.trades_frame(trades).sort_values('date', kind='stable')
+    fields = [
+        pa.field('date', pa.timestamp('ns')),
+        pa.field('type', pa.dictionary(pa.int8(), pa.string())),
+        pa.field('price', pa.float32() if compact else pa.float64()),
+        pa.field('size', pa.float32() if compact else pa.float64()),
+        pa.field('reason', pa.dictionary(pa.int8(), pa.string())),
+        pa.field('balance', pa.float32() if compact else pa.float64()),
+        pa.field('holding_days', pa.int32()),
+        pa.field('profit_pct', pa.float32() if compact else pa.float64()),
+    ]
+    table = pa.Table.from_pandas(df, preserve_index=False).cast(pa.schema(fields))
+    if compact and len(df) and not (df['date'].dt.normalize() != df['date']).any():
+        table = table.set_column(0, 'date', _dates(df['date'].values, True))
+    return table
+
+def indicators_table(df, compact=True):
+    # calculate_indicators() frame -> Arrow table (date + INDICATOR_COLS)
+    dtype = np.float32 if compact else np.float64
+    arrays = [_dates(df.index.values, compact)] + [pa.array(df[c].to_numpy(dtype=dtype)) for c in INDICATOR_COLS]
+    return pa.Table.from_arrays(arrays, names=['date'] + INDICATOR_COLS)
+
+# ---------------------------------------------------------
+# Parquet
+# ---------------------------------------------------------
+def write_parquet(table, path, meta=None):
+    # Atomic (tmp + rename); meta (JSON-able dict) goes into the schema metadata
+    if meta is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: json.dumps(meta)})
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+def read_table(path, columns=None):
+    # Memory-mapped read; table.to_pandas() for a DataFrame
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+def read_meta(path):
+    meta = pq.read_schema(path, memory_map=True).metadata or {}
+    return json.loads(meta[META_KEY]) if META_KEY in meta else None
+
+def _summary(result):
+    return {k: v for k, v in result.items()
+            if k not in ('equity_curve', 'trades', 'timings') and isinstance(v, (str, int, float, bool, dict))}
+
+def export_result(result, directory, df=None, compact=True):
+    # get_strategy_data() result (+ optional indicator frame) -> <directory>/<artifact>.parquet
+    if 'error' in result:
+        raise ValueError(result['error'])
+    os.makedirs(directory, exist_ok=True)
+    meta = _summary(result)
+    tables = {
+        "equity_curve": curve_table(result['equity_curve'], compact),
+        "trades": trades_table(result['trades'], compact),
+    }
+    if df is not None:
+        tables['indicators'] = indicators_table(df, compact)
+    paths = {}
+    for name, table in tables.items():
+        paths[name] = os.path.join(directory, name + '.parquet')
+        write_parquet(table, paths[name], meta)
+    return paths
+
+def load_artifacts(directory):
+    # {artifact: memory-mapped Arrow table} + "meta" for whatever export_result wrote
+    out = {}
+    for name in ARTIFACTS:
+        path = os.path.join(directory, name + '.parquet')
+        if os.path.exists(path):
+            out[name] = read_table(path)
+            out.setdefault('meta', read_meta(path))
+    return out
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a backtest as Parquet artifacts')
+    parser.add_argument('symbol', nargs='?', default=strategy_core.SYMBOL)
+    parser.add_argument('--out', default=None, help="Output directory (default: artifacts/<SYMBOL>)")
+    parser.add_argument('--full', action='store_true', help="float64 columns instead of the compact layout")
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    symbol = args.symbol.upper()
+    params = strategy_core.DEFAULT_PARAMS
+    df_raw = strategy_core.get_data(symbol, params['start_date'], provider=args.provider)
+    result = strategy_core.get_strategy_data(symbol, params, engine='vectorized', df_raw=df_raw,
+                                             output='columnar' if args.full else 'compact')
+    if 'error' in result:
+        raise SystemExit(result['error'])
+    df = strategy_core.calculate_indicators(df_raw, params)
+    for name, path in export_result(result, args.out or os.path.join('artifacts', symbol), df,
+                                    compact=not args.full).items():
+        print(f"{name}: {path} ({os.path.getsize(path):,} bytes)")
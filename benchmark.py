@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+import numpy as np
+import pandas as pd
+
+import strategy_core
+import price_cache
+import synthetic_data
+import downsample
+
+# =========================================================
+# ⏱️ PIPELINE BENCHMARKS (offline, synthetic data)
+# =========================================================
+# Times each stage of data -> indicators -> backtest -> render separately on
+# deterministic synthetic series, records peak traced memory per stage and
+# writes JSON that can be diffed between commits:
+#   python benchmark.py --out base.json
+#   python benchmark.py --out new.json --compare base.json
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOP_MAX_BARS = 200_000   # The per-bar loop is skipped above this size unless --all
+RENDER_MAX_BARS = 100_000 # So is full-resolution chart construction (one annotation per sell adds up)
+CHART_POINTS = 2000       # Fast render: points per downsampled series (dashboard default)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def _measure(fn, repeat):
+    # Best / median wall time over `repeat` runs, then one traced run for peak memory
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(times),
+        "median_seconds": float(np.median(times)),
+        "peak_mb": peak / 2 ** 20,
+    }
+
+def _render(bt, fast=False):
+    # Same figure / table construction as streamlit_app.py (serialized like st.plotly_chart).
+    # fast: the dashboard's Fast Charts mode (WebGL, downsampled, one text trace for labels)
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    curve = bt['equity_curve']
+    Scatter = go.Scattergl if fast else go.Scatter
+    if fast:
+        xy = lambda y: downsample.downsample(curve['date'], y, CHART_POINTS)
+    else:
+        xy = lambda y: (curve['date'], y)
+    fig_tech = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.7, 0.3])
+    for name in ('price', 'ma'):
+        x, y = xy(curve[name])
+        fig_tech.add_trace(Scatter(x=x, y=y, mode='lines', name=name), row=1, col=1)
+    buys = [t for t in bt['trades'] if t['type'] == 'Buy']
+    sells = [t for t in bt['trades'] if t['type'] == 'Sell']
+    if fast:
+        fig_tech.add_trace(Scatter(x=[t['date'] for t in sells], y=[t['price'] for t in sells], mode='text',
+                                   text=[f"{t['profit_pct']:.1f}%" for t in sells]), row=1, col=1)
+    else:
+        for t in sells:
+            fig_tech.add_annotation(x=t['date'], y=t['price'], text=f"{t['profit_pct']:.1f}%", showarrow=True)
+    fig_tech.add_trace(Scatter(x=[t['date'] for t in buys], y=[t['price'] for t in buys], mode='markers'), row=1, col=1)
+    fig_tech.add_trace(Scatter(x=[t['date'] for t in sells], y=[t['price'] for t in sells], mode='markers'), row=1, col=1)
+    x, y = xy(curve['equity'])
+    fig_equity = go.Figure(Scatter(x=x, y=y, mode='lines'))
+
+    html = "<table>"
+    for t in bt['trades']:
+        html += f"<tr><td>{t['type']}</td><td>{t['date']}</td><td>${t['price']:,.2f}</td></tr>"
+    html += "</table>"
+    return len(fig_tech.to_json()) + len(fig_equity.to_json()) + len(html)
+
+def bench_pipeline(n_bars, generator='leveraged', seed=0, repeat=3, include_loop=True, include_render=True):
+    df_raw = synthetic_data.GENERATORS[generator](n_bars, seed=seed)
+    params = dict(strategy_core.DEFAULT_PARAMS, start_date=df_raw.index[0].strftime('%Y-%m-%d'))
+    results = {}
+
+    # 1. Data: warm Parquet cache read through get_data (no network)
+    with tempfile.TemporaryDirectory() as tmp:
+        saved_dir = price_cache.CACHE_DIR
+        price_cache.CACHE_DIR = tmp
+        try:
+            results['cache_write'] = _measure(lambda: price_cache.write('BENCH', df_raw, params['start_date']), repeat)
+            results['get_data'] = _measure(lambda: strategy_core.get_data('BENCH', params['start_date']), repeat)
+        finally:
+            price_cache.CACHE_DIR = saved_dir
+
+    # 2. Indicators
+    results['indicators'] = _measure(lambda: strategy_core.calculate_indicators(df_raw, params), repeat)
+    df = strategy_core.calculate_indicators(df_raw, params)
+
+    # 3. Backtest engines
+    engines = ['vectorized'] + (['loop'] if include_loop else [])
+    for engine in engines:
+        results[f'backtest_{engine}'] = _measure(lambda: strategy_core.run_backtest(df, params, engine), repeat)
+    results['backtest_columnar'] = _measure(lambda: strategy_core.run_backtest(df, params, 'vectorized', 'columnar'), repeat)
+    bt = strategy_core.run_backtest(df, params, 'vectorized', 'columnar')
+
+    # 4. Metrics / diagnosis
+    results['summarize'] = _measure(lambda: strategy_core.summarize('BENCH', df, bt, params), repeat)
+
+    # 5. Chart + table construction (full resolution / Fast Charts mode)
+    try:
+        import plotly  # noqa: F401
+        if include_render:
+            results['render'] = _measure(lambda: _render(bt), max(1, repeat // 2))
+        results['render_fast'] = _measure(lambda: _render(bt, fast=True), repeat)
+    except ImportError:
+        pass
+
+    return [dict(stage=stage, bars=n_bars, generator=generator, **vals) for stage, vals in results.items()]
+
+def bench_sweep(n_sets=10_000, n_bars=4_000, generator='leveraged', seed=0):
+    # Parameter-sweep throughput of strategy_core.batch_backtest
+    df_raw = synthetic_data.GENERATORS[generator](n_bars, seed=seed)
+    params = dict(strategy_core.DEFAULT_PARAMS)
+    df = strategy_core.calculate_indicators(df_raw, params)
+    rng = np.random.default_rng(seed)
+    low = [30, 10, 50, 70, 0.05]
+    high = [80, 50, 90, 95, 0.30]
+    sets = pd.DataFrame(rng.uniform(low, high, (n_sets, len(low))), columns=strategy_core.BATCH_PARAM_COLS)
+
+    t0 = time.perf_counter()
+    strategy_core.batch_backtest(df, sets)
+    seconds = time.perf_counter() - t0
+    return {"sets": n_sets, "bars": len(df), "seconds": seconds, "backtests_per_sec": n_sets / seconds}
+
+def run(sizes=DEFAULT_SIZES, generator='leveraged', repeat=3, all_engines=False, render=True, sweep_sets=10_000):
+    out = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": [],
+        "sweep": None,
+    }
+    for n in sizes:
+        rows = bench_pipeline(n, generator, repeat=repeat if n < 1_000_000 else 1,
+                              include_loop=all_engines or n <= LOOP_MAX_BARS,
+                              include_render=render and (all_engines or n <= RENDER_MAX_BARS))
+        out['results'].extend(rows)
+        for r in rows:
+            print(f"{n:>9,} bars  {r['stage']:<20} {r['seconds'] * 1000:10.2f} ms  peak {r['peak_mb']:8.1f} MB", file=sys.stderr)
+    if sweep_sets:
+        out['sweep'] = bench_sweep(sweep_sets, generator=generator)
+        print(f"sweep: {out['sweep']['backtests_per_sec']:,.0f} backtests/s", file=sys.stderr)
+    return out
+
+def compare(new, base):
+    # Ratio table new/base per (bars, stage); > 1 means slower
+    key = lambda r: (r['bars'], r['stage'])
+    base_map = {key(r): r for r in base['results']}
+    rows = []
+    for r in new['results']:
+        b = base_map.get(key(r))
+        if b is None:
+            continue
+        rows.append({
+            "bars": r['bars'],
+            "stage": r['stage'],
+            "base_ms": b['seconds'] * 1000,
+            "new_ms": r['seconds'] * 1000,
+            "time_ratio": r['seconds'] / b['seconds'] if b['seconds'] else float('nan'),
+            "mem_ratio": r['peak_mb'] / b['peak_mb'] if b['peak_mb'] else float('nan'),
+        })
+    table = pd.DataFrame(rows)
+    if new.get('sweep') and base.get('sweep'):
+        print(f"sweep backtests/s: {base['sweep']['backtests_per_sec']:,.0f} -> {new['sweep']['backtests_per_sec']:,.0f}")
+    return table
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline pipeline benchmarks')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help='Comma-separated bar counts')
+    parser.add_argument('--generator', choices=list(synthetic_data.GENERATORS), default='leveraged')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--all', action='store_true', help='Run the loop engine and render at every size')
+    parser.add_argument('--no-render', action='store_true')
+    parser.add_argument('--sweep-sets', type=int, default=10_000, help='0 disables the sweep benchmark')
+    parser.add_argument('--out', default=None, help='Write JSON results here (default: stdout)')
+    parser.add_argument('--compare', default=None, help='Baseline JSON to compare against')
+    args = parser.parse_args()
+
+    res = run([int(s) for s in args.sizes.split(',')], args.generator, args.repeat, args.all,
+              not args.no_render, args.sweep_sets)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(res, f, indent=2)
+    else:
+        print(json.dumps(res, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(res, json.load(f)).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
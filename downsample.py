@@ -0,0 +1,74 @@
+import numpy as np
+
+# =========================================================
+# 📉 SHAPE-PRESERVING DOWNSAMPLING (charts)
+# =========================================================
+# A chart can't show more points than it has pixels, so long histories are
+# reduced to ~n_out points before they are sent to the browser.
+#   lttb   - Largest-Triangle-Three-Buckets: keeps the visual shape of a line
+#   minmax - min and max of every bucket: keeps every spike / drawdown bottom
+# Both return sorted indices into the input, always including the endpoints.
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').view('int64').astype('float64')
+    return x.astype('float64')
+
+def lttb_indices(x, y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype='float64')
+    every = (n - 2) / (n_out - 2)
+    out = np.empty(n_out, dtype='int64')
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle corner
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + (int(np.argmax(area)) if not np.isnan(area).all() else 0)
+        out[i + 1] = a
+    return out
+
+def minmax_indices(y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype='float64')
+    size = max(1, (n - 2) // ((n_out - 2) // 2))
+    m = 1 + ((n - 2) // size) * size
+    blocks = y[1:m].reshape(-1, size)
+    starts = np.arange(1, m, size)
+    idx = [np.array([0]), starts + blocks.argmin(axis=1), starts + blocks.argmax(axis=1)]
+    if m < n - 1:
+        tail = y[m:n - 1]
+        idx += [np.array([m + tail.argmin(), m + tail.argmax()])]
+    idx.append(np.array([n - 1]))
+    return np.unique(np.concatenate(idx))
+
+METHODS = ['lttb', 'minmax']
+
+def downsample(x, y, n_out, method='lttb'):
+    # Returns (x, y) reduced to about n_out points; NaN gaps (e.g. a series that
+    # starts later) are kept out of the buckets and stay gaps
+    x, y = np.asarray(x), np.asarray(y)
+    finite = np.flatnonzero(~np.isnan(y))
+    if len(finite) == 0 or len(y) <= n_out:
+        return x, y
+    lo, hi = finite[0], finite[-1] + 1
+    if method == 'lttb':
+        idx = lttb_indices(x[lo:hi], y[lo:hi], n_out)
+    elif method == 'minmax':
+        idx = minmax_indices(y[lo:hi], n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return x[lo:hi][idx], y[lo:hi][idx]
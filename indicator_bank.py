@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 🏦 INDICATOR BANK
+# =========================================================
+# Every MA / RSI period of a range at once, as (bars x periods) frames whose
+# columns are the periods: bank['MA'][192], bank['RSI_W'][23], ...
+# Matches calculate_indicators() up to float rounding (~1e-9), since window
+# sums come from one cumulative sum instead of pandas' rolling kernel.
+
+DEFAULT_MA_PERIODS = range(50, 301)     # Dashboard slider range
+DEFAULT_D_PERIODS = range(2, 15)
+DEFAULT_W_PERIODS = range(10, 51)       # Dashboard slider range
+WEEKLY_RULE = 'W-FRI'
+
+
+def _rolling_mean_2d(values, periods, zero_tol=0.0):
+    x = np.asarray(values, dtype='float64')
+    n = len(x)
+    nan = np.isnan(x)
+
+    # One cumulative-sum pass; every window is then a difference of two entries
+    cs = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, x))))
+    cn = np.concatenate(([0], np.cumsum(nan)))
+
+    out = np.full((n, len(periods)), np.nan)
+    for j, p in enumerate(periods):
+        if p > n:
+            continue
+        win = (cs[p:] - cs[:-p]) / p
+        # Same as rolling(p).mean(): any NaN inside the window -> NaN
+        win[(cn[p:] - cn[:-p]) > 0] = np.nan
+        out[p - 1:, j] = win
+    if zero_tol > 0:
+        # Cancellation in the cumulative sum leaves ~1e-15 residue where the
+        # true window sum is exactly 0 (flat prices); snap it back.
+        out[np.abs(out) < zero_tol] = 0.0
+    return out
+
+def ma_bank(close, periods=DEFAULT_MA_PERIODS):
+    periods = list(periods)
+    return pd.DataFrame(_rolling_mean_2d(close.values, periods), index=close.index, columns=periods)
+
+def rsi_bank(close, periods):
+    periods = list(periods)
+    x = close.to_numpy(dtype='float64')
+    delta = np.diff(x, prepend=np.nan)
+    # NaN deltas count as 0 gain / 0 loss, exactly like delta.where(delta > 0, 0)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    tol = 1e-12 * max(gain.sum() + loss.sum(), 1.0)
+
+    g = _rolling_mean_2d(gain, periods, tol)
+    l = _rolling_mean_2d(loss, periods, tol)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + g / l))
+    return pd.DataFrame(rsi, index=close.index, columns=periods)
+
+def build_indicator_bank(df, ma_periods=DEFAULT_MA_PERIODS, d_periods=DEFAULT_D_PERIODS,
+                         w_periods=DEFAULT_W_PERIODS, weekly_rule=WEEKLY_RULE):
+    close = df['Close']
+    close_w = df.resample(weekly_rule).last()['Close']
+    rsi_w_weekly = rsi_bank(close_w, w_periods)
+
+    return {
+        'Close': close,
+        'MA': ma_bank(close, ma_periods),
+        'RSI_D': rsi_bank(close, d_periods),
+        # Weekly values forward-filled onto the daily index (as in calculate_indicators)
+        'RSI_W': rsi_w_weekly.reindex(df.index).ffill(),
+        'RSI_W_weekly': rsi_w_weekly,
+        'Close_weekly': close_w,
+    }
+
+def indicators_from_bank(bank, p):
+    # Column lookup equivalent of calculate_indicators(df, p)
+    df = bank['Close'].to_frame()
+    df['MA'] = bank['MA'][p['ma_period']]
+    df['RSI_D'] = bank['RSI_D'][p['d_period']]
+    df['RSI_W'] = bank['RSI_W'][p['w_period']]
+    return df.dropna()
@@ -0,0 +1,304 @@
+import os
+import json
+import math
+import pandas as pd
+
+import strategy_core
+
+# =========================================================
+# 📡 INCREMENTAL (LIVE) STRATEGY STATE
+# =========================================================
+# Rolling-window state for MA / daily RSI / weekly RSI (incl. the partial
+# current week) plus the backtest position state, updated in O(1) per bar.
+# The state is a plain JSON-serializable dict, so a nightly job can
+#   state = load_state(path); update(state, date, close); save_state(state, path)
+# and get the same diagnosis / metrics as a full get_strategy_data() recompute.
+
+NAN = float('nan')
+RINGS = ['ma', 'd_gain', 'd_loss', 'w_gain', 'w_loss']
+
+
+# ---------------------------------------------------------
+# Ring buffers (rolling mean over the last `size` values)
+# ---------------------------------------------------------
+def _ring(size):
+    # 'nz' counts nonzero entries so all-zero windows sum to exactly 0.0
+    # (running sums would otherwise leave ~1e-17 residue and turn 0/0 into a number)
+    # 'undo' journals the pushes of the current bar: [pos, old value, count, sum, nz]
+    return {"buf": [0.0] * size, "pos": 0, "count": 0, "sum": 0.0, "nz": 0, "undo": []}
+
+def _ring_push(r, x):
+    size = len(r['buf'])
+    r.setdefault('undo', []).append([r['pos'], r['buf'][r['pos']], r['count'], r['sum'], r['nz']])
+    if r['count'] == size:
+        old = r['buf'][r['pos']]
+        r['sum'] -= old
+        r['nz'] -= old != 0
+    else:
+        r['count'] += 1
+    r['buf'][r['pos']] = x
+    r['sum'] += x
+    r['nz'] += x != 0
+    r['pos'] = (r['pos'] + 1) % size
+    if r['nz'] == 0:
+        r['sum'] = 0.0
+
+def _ring_undo(r):
+    # Roll back the journaled pushes (newest first)
+    for pos, old, count, total, nz in reversed(r.get('undo') or []):
+        r['buf'][pos] = old
+        r['pos'], r['count'], r['sum'], r['nz'] = pos, count, total, nz
+    r['undo'] = []
+
+def _ring_mean(r, extra=None):
+    # Mean of the window; with `extra`, the mean as if `extra` had been pushed
+    size = len(r['buf'])
+    total, count, nz = r['sum'], r['count'], r['nz']
+    if extra is not None:
+        if count == size:
+            old = r['buf'][r['pos']]
+            total -= old
+            nz -= old != 0
+        else:
+            count += 1
+        total += extra
+        nz += extra != 0
+    if count < size:
+        return NAN
+    return 0.0 if nz == 0 else total / size
+
+def _rsi(gain, loss):
+    # Same results as 100 - 100 / (1 + gain / loss) on pandas floats
+    if math.isnan(gain) or math.isnan(loss):
+        return NAN
+    if loss == 0:
+        return NAN if gain == 0 else 100.0
+    return 100 - (100 / (1 + gain / loss))
+
+def _week_label(ts):
+    # 'W-FRI' bin label: the Friday on/after the date
+    return (ts + pd.Timedelta(days=(4 - ts.weekday()) % 7)).normalize()
+
+# ---------------------------------------------------------
+# State
+# ---------------------------------------------------------
+def new_state(params=None, symbol=strategy_core.SYMBOL):
+    if params is None:
+        params = strategy_core.DEFAULT_PARAMS
+    params = dict(params)
+    return {
+        "symbol": symbol,
+        "params": params,
+        "bars": 0,
+        "last_bar": None,         # timestamp of the last applied bar (warm-up included)
+        "undo": None,             # scalar fields before that bar, to replace it (same date again)
+        # Indicators
+        "last_close": None,
+        "ma": _ring(params['ma_period']),
+        "d_gain": _ring(params['d_period']),
+        "d_loss": _ring(params['d_period']),
+        "w_gain": _ring(params['w_period']),
+        "w_loss": _ring(params['w_period']),
+        "week_label": None,       # label of the (possibly partial) current week
+        "week_close": None,       # its latest close
+        "prev_week_close": None,  # last completed week's close (None = NaN)
+        "rsi_w_carry": None,      # forward-filled daily RSI_W
+        # Strategy (same variables as the backtest loop)
+        "started": False,
+        "first_date": None,
+        "last_date": None,
+        "prev_row": None,
+        "row": None,
+        "in_pos": False,
+        "balance": float(strategy_core.INITIAL_CAPITAL),
+        "shares": 0.0,
+        "last_buy_price": 0.0,
+        "last_buy_date": None,
+        "win_count": 0,
+        "total_trades": 0,
+        "first_buy_price": 0.0,
+        "first_price": None,
+        "equity": float(strategy_core.INITIAL_CAPITAL),
+        "peak": None,
+        "mdd": 0.0,
+        "status": None,
+    }
+
+def _update_weekly(state, ts, close):
+    # Returns the weekly RSI for the week containing ts (using close as its last value)
+    label = _week_label(ts)
+    if state['week_label'] is None:
+        state['week_label'], state['week_close'] = label.isoformat(), close
+    elif label.isoformat() != state['week_label']:
+        # Finalize the previous week
+        prev_label = pd.Timestamp(state['week_label'])
+        delta = NAN if state['prev_week_close'] is None else state['week_close'] - state['prev_week_close']
+        _push_delta(state['w_gain'], state['w_loss'], delta)
+        state['prev_week_close'] = state['week_close']
+        # Whole weeks without bars are NaN in resample(): 0 gain / 0 loss, and
+        # the week after them has a NaN diff as well
+        empty_weeks = (label - prev_label).days // 7 - 1
+        for _ in range(empty_weeks):
+            _push_delta(state['w_gain'], state['w_loss'], NAN)
+            state['prev_week_close'] = None
+        state['week_label'], state['week_close'] = label.isoformat(), close
+    else:
+        state['week_close'] = close
+
+    delta = NAN if state['prev_week_close'] is None else close - state['prev_week_close']
+    gain = delta if delta > 0 else 0.0
+    loss = -delta if delta < 0 else 0.0
+    return _rsi(_ring_mean(state['w_gain'], gain), _ring_mean(state['w_loss'], loss))
+
+def _push_delta(gain_ring, loss_ring, delta):
+    # NaN compares False, so it becomes 0 gain / 0 loss (delta.where(delta > 0, 0))
+    _ring_push(gain_ring, delta if delta > 0 else 0.0)
+    _ring_push(loss_ring, -delta if delta < 0 else 0.0)
+
+def update(state, date, close):
+    # Append one bar. Returns the bar's indicator row (+ status / equity once the
+    # backtest has started), or None while indicators are still warming up.
+    # A bar dated like the last one replaces it (e.g. final close after an
+    # intraday snapshot); older bars (overlapping / repeated runs) are ignored.
+    ts = pd.Timestamp(date).tz_localize(None)
+    if state.get('last_bar') is not None:
+        last_bar = pd.Timestamp(state['last_bar'])
+        if ts < last_bar or (ts == last_bar and state.get('undo') is None):
+            return None
+        if ts == last_bar:
+            for k in RINGS:
+                _ring_undo(state[k])
+            state.update(state['undo'])
+    # O(1) undo record: the ring journals plus the scalar fields (rows are
+    # replaced, never mutated, so a shallow copy is enough)
+    for k in RINGS:
+        state[k]['undo'] = []
+    state['undo'] = {k: v for k, v in state.items() if k not in RINGS and k not in ('undo', 'params', 'symbol')}
+    state['last_bar'] = ts.isoformat()
+    close = float(close)
+    p = state['params']
+    state['bars'] += 1
+
+    # 1. Indicators
+    _ring_push(state['ma'], close)
+    delta = NAN if state['last_close'] is None else close - state['last_close']
+    _push_delta(state['d_gain'], state['d_loss'], delta)
+    state['last_close'] = close
+
+    rsi_w_week = _update_weekly(state, ts, close)
+    # Daily RSI_W = weekly value reindexed onto the daily index, then ffilled:
+    # only a Friday bar can refresh it (and only with a non-NaN value)
+    if ts.normalize().isoformat() == state['week_label'] and not math.isnan(rsi_w_week):
+        state['rsi_w_carry'] = rsi_w_week
+
+    row = {
+        "Close": close,
+        "MA": _ring_mean(state['ma']),
+        "RSI_D": _rsi(_ring_mean(state['d_gain']), _ring_mean(state['d_loss'])),
+        "RSI_W": NAN if state['rsi_w_carry'] is None else state['rsi_w_carry'],
+    }
+    # calculate_indicators() drops rows with any NaN; so does the live engine
+    if any(math.isnan(v) for v in row.values()) or ts < pd.Timestamp(p.get('start_date', '2020-01-01')):
+        return None
+
+    # 2. Strategy step (mirrors the backtest loop)
+    date_str = ts.strftime("%Y-%m-%d")
+    price = close
+    is_uptrend = price > row['MA']
+    if not state['started']:
+        state['started'] = True
+        state['first_date'] = date_str
+        state['first_price'] = price
+        status = 0
+    else:
+        prev = state['row']
+        status = 3 if state['in_pos'] else (1 if is_uptrend else 0)
+        if not state['in_pos']:
+            if is_uptrend and row['RSI_W'] < p['w_buy_max'] and prev['RSI_D'] < p['d_buy_cross'] and row['RSI_D'] >= p['d_buy_cross']:
+                state['in_pos'] = True
+                status = 2
+                state['shares'] = state['balance'] / price
+                state['balance'] = 0.0
+                state['last_buy_price'] = price
+                state['last_buy_date'] = date_str
+                if state['first_buy_price'] == 0:
+                    state['first_buy_price'] = round(price, 2)
+        else:
+            ref_price = state['last_buy_price'] if state['last_buy_price'] > 0 else price
+            cond_ma = not is_uptrend
+            cond_stop = ((price - ref_price) / ref_price) < -p['stop_loss']
+            cond_trend = prev['RSI_W'] > p['w_sell_cross'] and row['RSI_W'] <= p['w_sell_cross']
+            cond_profit = row['RSI_W'] >= p['w_profit_max']
+            if cond_ma or cond_stop or cond_trend or cond_profit:
+                status = 4 if cond_profit else (5 if cond_stop else 6)
+                if price > state['last_buy_price']:
+                    state['win_count'] += 1
+                state['total_trades'] += 1
+                state['balance'] = state['shares'] * price
+                state['shares'] = 0.0
+                state['in_pos'] = False
+
+    equity = state['shares'] * price if state['in_pos'] else state['balance']
+    # Drawdown on cent-rounded equity, like get_strategy_data
+    eq = round(equity, 2)
+    state['peak'] = eq if state['peak'] is None else max(state['peak'], eq)
+    state['mdd'] = min(state['mdd'], (eq - state['peak']) / state['peak'])
+
+    state['equity'] = equity
+    state['status'] = status
+    state['prev_row'], state['row'] = state['row'], row
+    state['last_date'] = date_str
+    return dict(row, date=date_str, equity=eq, s=status)
+
+def replay(df, params=None, symbol=strategy_core.SYMBOL, state=None):
+    # Feed a whole price frame (get_data output) through update()
+    state = state or new_state(params, symbol)
+    for ts, close in zip(df.index, df['Close'].to_numpy()):
+        update(state, ts, close)
+    return state
+
+# ---------------------------------------------------------
+# Outputs
+# ---------------------------------------------------------
+def diagnosis(state):
+    if state['prev_row'] is None:
+        return None
+    return strategy_core.diagnose(state['row'], state['prev_row'], state['params'], state['in_pos'])
+
+def summary(state):
+    # Same keys/values as the metric part of get_strategy_data()
+    if state['row'] is None:
+        return {"error": "Not enough data"}
+    final_val = round(state['equity'], 2)
+    years = (pd.Timestamp(state['last_date']) - pd.Timestamp(state['first_date'])).days / 365.25
+    cagr = (final_val / strategy_core.INITIAL_CAPITAL) ** (1 / years) - 1 if years > 0 else 0
+    total = state['total_trades']
+    win_rate = (state['win_count'] / total * 100) if total > 0 else 0
+    price = state['row']['Close']
+    bnh_start = (strategy_core.INITIAL_CAPITAL / state['first_price']) * price if state['first_price'] > 0 else 0
+    bnh_first_buy = (strategy_core.INITIAL_CAPITAL / state['first_buy_price']) * price if state['first_buy_price'] > 0 else 0
+    return {
+        "symbol": state['symbol'],
+        "start_date": state['first_date'],
+        "last_date": state['last_date'],
+        "final_balance": round(final_val, 0),
+        "bnh_start": round(bnh_start, 0),
+        "bnh_first_buy": round(bnh_first_buy, 0),
+        "initial_capital": strategy_core.INITIAL_CAPITAL,
+        "cagr": round(cagr * 100, 2),
+        "mdd": round(state['mdd'] * 100, 2),
+        "total_trades": total,
+        "win_count": state['win_count'],
+        "win_rate": round(win_rate, 1),
+        "in_pos": state['in_pos'],
+        "diagnosis": diagnosis(state),
+    }
+
+def save_state(state, path):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+def load_state(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,213 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+import strategy_core
+import synthetic_data
+import providers
+
+# =========================================================
+# 🎲 MONTE CARLO ROBUSTNESS (block bootstrap)
+# =========================================================
+# Resamples the downloaded Close series into thousands of alternative price
+# paths (circular block bootstrap of bar returns, so volatility clusters and
+# short trends survive) and runs the strategy on all of them at once:
+# paths are the columns of (bars x paths) arrays, MA / RSI are rolling sums
+# down the bar axis and strategy_core.batch_kernel trades every column in one
+# pass over time. Paths are processed `batch_paths` columns at a time to bound
+# memory.
+#
+# leverage: treat the input as the underlying (e.g. QQQ) and build each path
+# as a daily-reset leveraged series from the resampled underlying returns
+# (synthetic_data.lever), instead of resampling the leveraged ETF itself.
+
+N_PATHS = 1000
+BLOCK_LEN = 20          # ~1 month of daily bars
+BATCH_PATHS = 1000
+LEVERAGE_EXPENSE = 0.0095
+METRIC_COLS = ['cagr', 'mdd', 'total_trades', 'win_rate', 'final_balance']
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+# ---------------------------------------------------------
+# Path generation
+# ---------------------------------------------------------
+def block_starts(n_returns, n_bars, n_paths, block_len=BLOCK_LEN, rng=None):
+    # (n_blocks x n_paths) random block start positions; drawn for every path
+    # up front so results don't depend on how paths are batched
+    rng = rng or np.random.default_rng()
+    return rng.integers(0, n_returns, size=(-(-n_bars // block_len), n_paths))
+
+def bootstrap_returns(returns, starts, n_bars, block_len=BLOCK_LEN):
+    # (n_bars x paths) returns: blocks of block_len consecutive bars from each
+    # start, wrapping around the end of the series (block_len=1 -> plain i.i.d. bootstrap)
+    n_blocks, n_paths = starts.shape
+    idx = (starts[:, None, :] + np.arange(block_len)[None, :, None]) % len(returns)
+    return returns[idx.reshape(n_blocks * block_len, n_paths)[:n_bars]]
+
+def price_paths(start_price, returns):
+    # Bar 0 is start_price on every path; returns[k] moves bar k to bar k+1
+    out = np.empty((len(returns) + 1, returns.shape[1]))
+    out[0] = start_price
+    np.cumprod(1 + returns, axis=0, out=out[1:])
+    out[1:] *= start_price
+    return out
+
+# ---------------------------------------------------------
+# Indicators down the bar axis (same definitions as calculate_indicators)
+# ---------------------------------------------------------
+def _rolling_mean(x, period, zero_tol=None):
+    # In place on a fresh cumulative sum: window sum = cs[i] - cs[i - period]
+    if period > len(x):
+        return np.full(x.shape, np.nan)
+    out = np.cumsum(x, axis=0)
+    out[period:] -= out[:-period].copy()
+    out[:period - 1] = np.nan
+    out[period - 1:] /= period
+    if zero_tol is not None:
+        # Cumulative-sum residue where the true (non-negative) window sum is 0,
+        # see indicator_bank
+        out[out < zero_tol] = 0.0
+    return out
+
+def _rsi(close, period):
+    # Row 0 / empty bins (NaN closes) count as a 0 move, like delta.where(...) does
+    delta = np.empty_like(close)
+    delta[0] = 0.0
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    if np.isnan(delta).any():
+        np.nan_to_num(delta, copy=False)
+    gain = np.maximum(delta, 0.0)
+    loss = np.subtract(gain, delta, out=delta)
+    tol = 1e-12 * np.maximum(gain.sum(axis=0) + loss.sum(axis=0), 1.0)
+    rsi = _rolling_mean(gain, period, tol)
+    l = _rolling_mean(loss, period, tol)
+    # 100 - (100 / (1 + g / l)), without the temporaries
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(rsi, l, out=rsi)
+        rsi += 1
+        np.divide(100, rsi, out=rsi)
+        np.subtract(100, rsi, out=rsi)
+    return rsi
+
+def _ffill(x):
+    rows = np.where(np.isnan(x), 0, np.arange(len(x))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(x, rows, axis=0)
+
+def htf_layout(index, p):
+    # (src, dst) bar positions per slower-timeframe bin: src is the bar whose
+    # close ends the bin (-1: empty bin), dst the bar that shows its RSI (-1: none).
+    # Mirrors both branches of calculate_indicators, since every path shares the calendar.
+    rule = strategy_core._htf_rule(p)
+    last = pd.Series(np.arange(len(index)), index=index).resample(rule).last()
+    if p.get('interval', '1d') != '1d' or rule != 'W-FRI':
+        src = last.dropna().to_numpy('int64')
+        return src, src
+    # Daily / W-FRI: empty weeks stay in the series and values land on the Friday label
+    return last.fillna(-1).to_numpy('int64'), index.get_indexer(last.index)
+
+def _htf_rsi(close, layout, period):
+    src, dst = layout
+    c = np.where((src >= 0)[:, None], close[np.maximum(src, 0)], np.nan)
+    keep = dst >= 0
+    # Forward-fill on the (small) bin axis, then spread bins onto bars with one gather
+    rsi = _ffill(_rsi(c, period)[keep])
+    rsi = np.vstack([np.full((1, close.shape[1]), np.nan), rsi])
+    bin_of_bar = np.searchsorted(dst[keep], np.arange(len(close)), side='right')
+    return rsi[bin_of_bar]
+
+def run_paths(close, index, p, lo, layout=None):
+    # close: (bars x paths) over the whole history; trades bars lo.. like get_strategy_data
+    layout = layout if layout is not None else htf_layout(index, p)
+    table = strategy_core._param_table([[p[c] for c in strategy_core.BATCH_PARAM_COLS]] * close.shape[1])
+    return strategy_core.batch_kernel(
+        close[lo:], index[lo:],
+        _rolling_mean(close, p['ma_period'])[lo:],
+        _rsi(close, p['d_period'])[lo:],
+        _htf_rsi(close, layout, p['w_period'])[lo:],
+        table,
+    )
+
+# ---------------------------------------------------------
+# Driver
+# ---------------------------------------------------------
+def summarize_paths(paths):
+    summary = paths[METRIC_COLS].quantile([q / 100 for q in PERCENTILES]).T
+    summary.columns = [f"p{q}" for q in PERCENTILES]
+    summary['mean'] = paths[METRIC_COLS].mean()
+    return summary
+
+def monte_carlo(symbol=strategy_core.SYMBOL, params=None, n_paths=N_PATHS, block_len=BLOCK_LEN, seed=None,
+                leverage=None, expense=LEVERAGE_EXPENSE, df=None, batch_paths=BATCH_PATHS):
+    if params is None:
+        params = strategy_core.DEFAULT_PARAMS
+    start_date = params.get('start_date', '2020-01-01')
+    if df is None:
+        df = strategy_core.get_data(symbol, start_date, interval=params.get('interval', '1d'))
+    if df.empty:
+        return {"error": "Failed to download data"}
+
+    index = df.index
+    close = df['Close'].to_numpy(dtype='float64')
+    returns = close[1:] / close[:-1] - 1
+    bars_per_year = providers.INTERVALS[params.get('interval', '1d')]['bars_per_year']
+    if leverage is not None:
+        def path_returns(r):
+            return synthetic_data.lever(r, leverage, expense, bars_per_year)
+    else:
+        def path_returns(r):
+            return r
+
+    # Historical path (leveraged from the underlying when asked) fixes the first
+    # traded bar: same warm-up and start date as get_strategy_data
+    actual_close = price_paths(close[0], path_returns(returns)[:, None])
+    df_ind = strategy_core.calculate_indicators(pd.DataFrame({'Close': actual_close[:, 0]}, index=index), params)
+    df_ind = df_ind[df_ind.index >= pd.to_datetime(start_date)]
+    if len(df_ind) < 2:
+        return {"error": "Not enough data after the indicator warm-up"}
+    lo = index.get_loc(df_ind.index[0])
+
+    layout = htf_layout(index, params)
+    actual = run_paths(actual_close, index, params, lo, layout).iloc[0]
+
+    starts = block_starts(len(returns), len(returns), n_paths, block_len, np.random.default_rng(seed))
+    frames = []
+    for done in range(0, n_paths, batch_paths):
+        r = path_returns(bootstrap_returns(returns, starts[:, done:done + batch_paths], len(returns), block_len))
+        frames.append(run_paths(price_paths(close[0], r), index, params, lo, layout)[METRIC_COLS])
+    paths = pd.concat(frames, ignore_index=True)
+
+    return {
+        "symbol": symbol,
+        "n_paths": n_paths,
+        "block_len": block_len,
+        "leverage": leverage,
+        "start_date": index[lo].strftime("%Y-%m-%d"),
+        "actual": {c: round(float(actual[c]), 2) for c in METRIC_COLS},
+        "paths": paths,
+        "summary": summarize_paths(paths),
+        "prob_loss": round(float((paths['cagr'] < 0).mean()) * 100, 1),
+        "prob_worse_mdd": round(float((paths['mdd'] < actual['mdd']).mean()) * 100, 1),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo (block bootstrap) robustness test')
+    parser.add_argument('symbol', nargs='?', default=strategy_core.SYMBOL)
+    parser.add_argument('--paths', type=int, default=N_PATHS)
+    parser.add_argument('--block', type=int, default=BLOCK_LEN, help="Bootstrap block length in bars")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--underlying', default=None, help="Resample this symbol and apply --leverage (e.g. QQQ)")
+    parser.add_argument('--leverage', type=float, default=3.0)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    source = (args.underlying or args.symbol).upper()
+    out = monte_carlo(args.symbol.upper(), n_paths=args.paths, block_len=args.block, seed=args.seed,
+                      leverage=args.leverage if args.underlying else None,
+                      df=strategy_core.get_data(source, strategy_core.DEFAULT_PARAMS['start_date'], provider=args.provider))
+    if 'error' in out:
+        raise SystemExit(out['error'])
+    print(out['summary'].round(2).to_string())
+    print(f"Historical: CAGR {out['actual']['cagr']}% / MDD {out['actual']['mdd']}%  |  "
+          f"P(CAGR < 0) {out['prob_loss']}%  P(MDD worse) {out['prob_worse_mdd']}%")
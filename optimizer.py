@@ -0,0 +1,110 @@
+import os
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import strategy_core
+
+# =========================================================
+# 🔎 PARALLEL PARAMETER OPTIMIZER
+# =========================================================
+# Structural params (ma_period / d_period / w_period) change the indicators,
+# so each combination is one task; all threshold rows for that combination
+# are evaluated inside the task with strategy_core.batch_backtest.
+# The price series lives in shared memory: workers attach to it once in the
+# pool initializer instead of unpickling a DataFrame per task.
+
+STRUCTURAL_COLS = ['ma_period', 'd_period', 'w_period']
+
+_worker = {}
+
+
+def _share_prices(df):
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 16, 1))
+    np.ndarray(n, dtype='float64', buffer=shm.buf)[:] = df['Close'].to_numpy(dtype='float64')
+    np.ndarray(n, dtype='int64', buffer=shm.buf, offset=n * 8)[:] = df.index.values.astype('datetime64[ns]').view('int64')
+    return shm
+
+def _attach_prices(name, n):
+    try:
+        # The parent owns (and unlinks) the block
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the parent's resource tracker
+        shm = shared_memory.SharedMemory(name=name)
+    close = np.ndarray(n, dtype='float64', buffer=shm.buf)
+    stamps = np.ndarray(n, dtype='int64', buffer=shm.buf, offset=n * 8)
+    _worker['shm'] = shm
+    _worker['df'] = pd.DataFrame({'Close': close}, index=pd.DatetimeIndex(stamps.view('datetime64[ns]')), copy=False)
+
+def _run_task(structural, thresholds, start_date):
+    p = dict(zip(STRUCTURAL_COLS, structural))
+    df = strategy_core.calculate_indicators(_worker['df'], p)
+    df_bt = df[df.index >= pd.to_datetime(start_date)]
+    if len(df_bt) < 2:
+        return None
+    result = strategy_core.batch_backtest(df_bt, thresholds)
+    for pos, (col, val) in enumerate(p.items()):
+        result.insert(pos, col, val)
+    return result
+
+def iter_optimize(symbol=strategy_core.SYMBOL, ma_periods=(strategy_core.DEFAULT_PARAMS['ma_period'],),
+                  w_periods=(strategy_core.DEFAULT_PARAMS['w_period'],), d_periods=(strategy_core.DEFAULT_PARAMS['d_period'],),
+                  thresholds=None, start_date=strategy_core.DEFAULT_PARAMS['start_date'], max_workers=None, df=None):
+    # Yields one result DataFrame per structural combination, as workers finish.
+    if thresholds is None:
+        thresholds = strategy_core.param_grid()
+    thresholds = thresholds[strategy_core.BATCH_PARAM_COLS].to_numpy(dtype='float64')
+    if df is None:
+        df = strategy_core.get_data(symbol, start_date)
+    if df.empty:
+        raise ValueError(f"No price data for {symbol}")
+
+    combos = list(itertools.product(ma_periods, d_periods, w_periods))
+    shm = _share_prices(df)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_attach_prices, initargs=(shm.name, len(df))) as pool:
+            futures = [pool.submit(_run_task, c, thresholds, start_date) for c in combos]
+            for fut in as_completed(futures):
+                result = fut.result()
+                if result is not None:
+                    yield result
+    finally:
+        shm.close()
+        shm.unlink()
+
+def optimize(*args, sort_by='cagr', **kwargs):
+    frames = list(iter_optimize(*args, **kwargs))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values(sort_by, ascending=False, ignore_index=True)
+
+def _parse_range(text):
+    # "50:300:10" -> range(50, 301, 10), "23" -> [23], "10,20,30" -> [10, 20, 30]
+    if ':' in text:
+        parts = [int(x) for x in text.split(':')]
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) > 2 else 1
+        return range(start, stop + 1, step)
+    return [int(x) for x in text.split(',')]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel ma_period / w_period search')
+    parser.add_argument('symbol', nargs='?', default=strategy_core.SYMBOL)
+    parser.add_argument('--ma', default='50:300:10', help='MA periods, e.g. 50:300:10')
+    parser.add_argument('--w', default='10:50:2', help='Weekly RSI periods, e.g. 10:50:2')
+    parser.add_argument('--start', default=strategy_core.DEFAULT_PARAMS['start_date'])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    res = optimize(args.symbol.upper(), ma_periods=_parse_range(args.ma), w_periods=_parse_range(args.w),
+                   start_date=args.start, max_workers=args.workers,
+                   df=strategy_core.get_data(args.symbol, args.start, provider=args.provider))
+    print(res.head(args.top).to_string(index=False))
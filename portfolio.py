@@ -0,0 +1,224 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+import strategy_core
+
+# =========================================================
+# 🧺 PORTFOLIO (MULTI-ASSET) BACKTEST
+# =========================================================
+# Many symbols on one calendar (the union of their trading days) as
+# (bars x symbols) arrays. Every symbol runs the single-symbol signal logic
+# (same entries / exits / stop loss as get_strategy_data, from
+# strategy_core.signal_arrays); one pass over time, vectorized across symbols,
+# then shares a single capital pool between the signals:
+#   weighting='active' - equal weight among held positions (fully invested)
+#   weighting='slots'  - 1 / max_positions per position, the rest stays cash
+#   max_positions      - entry signals beyond the free slots are skipped
+#                        (earlier symbols in the list win ties); a skipped
+#                        symbol waits for its next entry signal
+#   rebalance_band     - a held position whose weight drifts more than this
+#                        from its target is traded back to it (None = never)
+# A symbol only trades on bars it has data for; on other bars (not listed yet,
+# its own holidays) the last close values the position.
+# With one symbol and the defaults this reproduces get_strategy_data.
+
+WEIGHTINGS = ['active', 'slots']
+REBALANCE_BAND = 0.05
+
+
+def _ffill(x):
+    rows = np.where(np.isnan(x), 0, np.arange(len(x))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(x, rows, axis=0)
+
+def align(data, params):
+    # {symbol: raw price frame} -> symbols, union index and (bars x symbols)
+    # close (NaN where a symbol has no bar), entry / exit signals, tradable mask
+    start = pd.to_datetime(params.get('start_date', '2020-01-01'))
+    table = strategy_core._param_table([[params[c] for c in strategy_core.BATCH_PARAM_COLS]])
+    frames = {}
+    for symbol, df in data.items():
+        if df is None or df.empty:
+            continue
+        ind = strategy_core.calculate_indicators(df, params)
+        ind = ind[ind.index >= start]
+        if len(ind) >= 2:
+            frames[symbol] = ind
+    symbols = list(frames)
+    if not symbols:
+        return symbols, pd.DatetimeIndex([]), None, None, None, None
+    index = pd.DatetimeIndex(np.unique(np.concatenate([f.index.values for f in frames.values()])))
+
+    shape = (len(index), len(symbols))
+    close = np.full(shape, np.nan)
+    buy_sig = np.zeros(shape, dtype=bool)
+    exit_sig = np.zeros(shape, dtype=bool)
+    for j, f in enumerate(frames.values()):
+        pos = index.get_indexer(f.index)
+        b, e = strategy_core.signal_arrays(f['Close'].to_numpy(), f['MA'].to_numpy(), f['RSI_D'].to_numpy(),
+                                           f['RSI_W'].to_numpy(), table)
+        close[pos, j] = f['Close'].to_numpy()
+        buy_sig[pos, j] = b[:, 0]
+        exit_sig[pos, j] = e[:, 0]
+    return symbols, index, close, buy_sig, exit_sig, ~np.isnan(close)
+
+def run_portfolio(data, params=None, weighting='active', max_positions=None, rebalance_band=REBALANCE_BAND,
+                  initial_capital=strategy_core.INITIAL_CAPITAL):
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown weighting: {weighting}")
+    if params is None:
+        params = strategy_core.DEFAULT_PARAMS
+    symbols, index, close, buy_sig, exit_sig, tradable = align(data, params)
+    if not symbols:
+        return {"error": "No symbol has enough data"}
+
+    n_bars, n_sym = close.shape
+    slots = min(max_positions or n_sym, n_sym)
+    stop_loss = float(params['stop_loss'])
+    fmt = strategy_core._date_format(index)
+    prices = _ffill(close)
+
+    in_sig = np.zeros(n_sym, dtype=bool)    # Single-symbol strategy position
+    entry = np.zeros(n_sym)                 # ... and its entry price (stop loss reference)
+    held = np.zeros(n_sym, dtype=bool)      # Actually holding shares
+    shares = np.zeros(n_sym)
+    cash = float(initial_capital)
+    equity = np.empty(n_bars)
+    exposure = np.empty(n_bars)
+    positions = np.empty(n_bars, dtype=np.int64)
+    weights = np.zeros((n_bars, n_sym))
+    signals = np.zeros(n_sym, dtype=np.int64)
+    taken = np.zeros(n_sym, dtype=np.int64)
+    trades = []
+
+    def record(i, idx, kind, delta, reason=None):
+        for j, d in zip(idx, delta):
+            trades.append({"date": index[i].strftime(fmt), "symbol": symbols[j], "type": kind,
+                           "price": round(float(prices[i, j]), 2), "shares": round(float(d), 4),
+                           "value": round(float(d * prices[i, j]), 2), "reason": reason})
+
+    for i in range(n_bars):
+        px = prices[i]
+        live = tradable[i]
+
+        # 1. Signal exits / entries from the state at the start of the bar
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stopped = in_sig & live & ((px - entry) / entry < -stop_loss)
+        sell = stopped | (in_sig & exit_sig[i])
+        new = ~in_sig & buy_sig[i]
+        if sell.any():
+            for reason, mask in (('Stop Loss', stopped), ('Signal', sell & ~stopped)):
+                idx = np.flatnonzero(mask & held)
+                if len(idx):
+                    cash += float((shares[idx] * px[idx]).sum())
+                    record(i, idx, 'Sell', -shares[idx], reason)
+            shares[sell] = 0
+            held[sell] = False
+            in_sig[sell] = False
+        if new.any():
+            in_sig[new] = True
+            entry[new] = px[new]
+            signals[new] += 1
+
+        # 2. Free slots go to new signals in symbol order
+        cand = np.flatnonzero(new)[:max(slots - int(held.sum()), 0)]
+        target_set = held.copy()
+        target_set[cand] = True
+        k = int(target_set.sum())
+
+        # 3. Allocation: trims first, then buys (scaled down to the cash there is)
+        value = np.where(held, shares * px, 0.0)
+        total = cash + value.sum()
+        if k:
+            w = 1.0 / (k if weighting == 'active' else slots)
+            target = total * w
+            adjust = np.zeros(n_sym, dtype=bool)
+            if rebalance_band is not None and total > 0:
+                adjust = held & live & (np.abs(value / total - w) > rebalance_band)
+            trim = adjust & (value > target)
+            if trim.any():
+                idx = np.flatnonzero(trim)
+                delta = (value[idx] - target) / px[idx]
+                shares[idx] -= delta
+                cash += float((delta * px[idx]).sum())
+                record(i, idx, 'Rebalance', -delta)
+            top_up = adjust & (value < target)
+            need = np.zeros(n_sym)
+            need[top_up] = target - value[top_up]
+            need[cand] = target
+            if need.sum() > max(cash, 0.0):
+                need *= max(cash, 0.0) / need.sum()
+            buy = np.flatnonzero(need > 0)
+            if len(buy):
+                delta = need[buy] / px[buy]
+                shares[buy] += delta
+                cash -= float(need[buy].sum())
+                held[buy] = True
+                taken[np.intersect1d(buy, cand)] += 1
+                for kind, mask in (('Buy', np.isin(buy, cand)), ('Rebalance', ~np.isin(buy, cand))):
+                    record(i, buy[mask], kind, delta[mask])
+
+        value = np.where(held, shares * px, 0.0)
+        equity[i] = cash + value.sum()
+        exposure[i] = value.sum() / equity[i] if equity[i] > 0 else 0.0
+        positions[i] = int(held.sum())
+        weights[i] = value / equity[i] if equity[i] > 0 else 0.0
+
+    years = (index[-1] - index[0]).days / 365.25
+    cagr = (equity[-1] / initial_capital) ** (1 / years) - 1 if years > 0 else 0
+    peak = np.maximum.accumulate(equity)
+    mdd = float(((equity - peak) / peak).min())
+    per_symbol = pd.DataFrame({
+        "signals": signals,
+        "taken": taken,
+        "skipped": signals - taken,
+        "bars_held": (weights > 0).sum(axis=0),
+        "avg_weight": weights.mean(axis=0),
+    }, index=pd.Index(symbols, name='symbol'))
+
+    return {
+        "symbols": symbols,
+        "start_date": index[0].strftime(fmt),
+        "last_date": index[-1].strftime(fmt),
+        "initial_capital": initial_capital,
+        "final_balance": round(float(equity[-1]), 0),
+        "cagr": round(cagr * 100, 2),
+        "mdd": round(mdd * 100, 2),
+        "avg_exposure": round(float(exposure.mean()) * 100, 1),
+        "total_trades": int(sum(t['type'] == 'Sell' for t in trades)),
+        "curve": pd.DataFrame({"equity": equity, "exposure": exposure, "positions": positions}, index=index),
+        "weights": pd.DataFrame(weights, index=index, columns=symbols),
+        "per_symbol": per_symbol,
+        "trades": trades,
+    }
+
+def portfolio_backtest(symbols, params=None, provider=None, **kwargs):
+    # Download (one batch) + run_portfolio
+    if params is None:
+        params = strategy_core.DEFAULT_PARAMS
+    data = strategy_core.get_data_many(symbols, params.get('start_date', '2020-01-01'), provider=provider,
+                                       interval=params.get('interval', '1d'))
+    return run_portfolio(data, params, **kwargs)
+
+if __name__ == '__main__':
+    import universe
+
+    parser = argparse.ArgumentParser(description='Portfolio backtest across symbols')
+    parser.add_argument('symbols', nargs='*', default=universe.UNIVERSE)
+    parser.add_argument('--weighting', choices=WEIGHTINGS, default='active')
+    parser.add_argument('--max-positions', type=int, default=None)
+    parser.add_argument('--band', type=float, default=REBALANCE_BAND, help="Rebalance band in weight points (<0: never)")
+    parser.add_argument('--start', default=strategy_core.DEFAULT_PARAMS['start_date'])
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    params = dict(strategy_core.DEFAULT_PARAMS, start_date=args.start)
+    out = portfolio_backtest([s.upper() for s in args.symbols], params, provider=args.provider,
+                             weighting=args.weighting, max_positions=args.max_positions,
+                             rebalance_band=args.band if args.band >= 0 else None)
+    if 'error' in out:
+        raise SystemExit(out['error'])
+    print(out['per_symbol'].round(3).to_string())
+    print(f"{out['start_date']} ~ {out['last_date']}  CAGR {out['cagr']}% / MDD {out['mdd']}%  "
+          f"exposure {out['avg_exposure']}%  trades {out['total_trades']}  final {out['final_balance']:,.0f}")
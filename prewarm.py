@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import argparse
+import threading
+import pandas as pd
+
+import strategy_core
+import price_cache
+import providers
+
+# =========================================================
+# 🌅 AFTER-CLOSE PRE-WARM
+# =========================================================
+# After every US session close (+ PREWARM_DELAY, so the provider has the final
+# bar) the watchlist is re-downloaded in one batch and the default-parameter
+# backtests are recomputed into the result cache (one per PREWARM_RUNS combo).
+#   python prewarm.py            - standalone: keeps the on-disk price cache warm
+#   start_background()           - in-process (the dashboard): also fills that
+#                                  process's result cache
+# Each run records per-symbol freshness in <CACHE_DIR>/prewarm.json.
+
+MARKET_TZ = 'America/New_York'
+SESSION_CLOSE = '16:00'
+PREWARM_DELAY = 20 * 60   # Seconds after the close
+WATCHLIST = [s.strip().upper() for s in os.environ.get('TQ_WATCHLIST', strategy_core.SYMBOL).split(',') if s.strip()]
+ENABLED = os.environ.get('TQ_PREWARM', '1') != '0'
+# (engine, output) of the consumers: the dashboard, then CLI / API callers
+PREWARM_RUNS = [('vectorized', 'columnar'), ('loop', 'records')]
+
+_status_lock = threading.Lock()
+_background = None
+
+
+def _now(now=None):
+    return pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now).tz_convert(MARKET_TZ)
+
+def last_close(now=None):
+    # Most recent weekday close at or before `now`. Exchange holidays aren't
+    # skipped: a holiday run just finds no new bar.
+    now = _now(now)
+    hour, minute = map(int, SESSION_CLOSE.split(':'))
+    close = now.replace(hour=hour, minute=minute, second=0, microsecond=0, nanosecond=0)
+    if close > now:
+        close -= pd.DateOffset(days=1)
+    while close.weekday() >= 5:
+        close -= pd.DateOffset(days=1)
+    return close
+
+def next_run(now=None):
+    now = _now(now)
+    run = last_close(now) + pd.Timedelta(seconds=PREWARM_DELAY)
+    while run <= now or run.weekday() >= 5:
+        run += pd.DateOffset(days=1)
+    return run
+
+# ---------------------------------------------------------
+# Freshness status
+# ---------------------------------------------------------
+def _status_path():
+    return os.path.join(price_cache.CACHE_DIR, 'prewarm.json')
+
+def read_status():
+    try:
+        with open(_status_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_status(updates):
+    with _status_lock:
+        status = read_status()
+        status.update(updates)
+        os.makedirs(price_cache.CACHE_DIR, exist_ok=True)
+        with open(_status_path() + '.tmp', 'w') as f:
+            json.dump(status, f)
+        os.replace(_status_path() + '.tmp', _status_path())
+
+def freshness(symbol, interval='1d'):
+    # "Data as of": last cached bar + download time (price cache) and the last pre-warm
+    meta = price_cache.read_meta(symbol, interval) or {}
+    warm = read_status().get(symbol.upper(), {})
+    return {
+        "last_bar": meta.get('last_date'),
+        "fetched_at": meta.get('fetched_at'),
+        "warmed_at": warm.get('warmed_at'),
+        "warm_error": warm.get('error'),
+    }
+
+# ---------------------------------------------------------
+# Runs
+# ---------------------------------------------------------
+def prewarm(symbols=None, params=None, provider=None, runs=PREWARM_RUNS, refresh=True):
+    # refresh: ask the provider for new bars even if the cache was refreshed intraday
+    symbols = [s.upper() for s in (symbols or WATCHLIST)]
+    params = params or strategy_core.DEFAULT_PARAMS
+    data = strategy_core.get_data_many(symbols, params.get('start_date', '2020-01-01'), provider=provider,
+                                       interval=params.get('interval', '1d'), ttl=0 if refresh else None)
+    name = providers.get_provider(provider)['name']
+    status = {}
+    for symbol in symbols:
+        t0 = time.perf_counter()
+        entry = {"provider": name, "warmed_at": time.time()}
+        df = data.get(symbol)
+        if df is None or df.empty:
+            entry['error'] = "Failed to download data"
+        else:
+            try:
+                for engine, output in runs:
+                    strategy_core.get_strategy_data(symbol, params, engine=engine, output=output, df_raw=df)
+                entry.update(last_bar=df.index[-1].strftime(strategy_core._date_format(df.index)), rows=len(df))
+            except Exception as e:
+                entry['error'] = str(e)
+        entry['seconds'] = round(time.perf_counter() - t0, 3)
+        status[symbol] = entry
+    _write_status(status)
+    return status
+
+def _warmed_since(symbols, when):
+    status = read_status()
+    return all(status.get(s.upper(), {}).get('warmed_at', 0) >= when.timestamp() for s in symbols)
+
+def run_forever(symbols=None, params=None, provider=None, stop=None):
+    symbols = symbols or WATCHLIST
+    stop = stop or threading.Event()
+    # Startup: fill this process's result cache; only re-download if the last
+    # close hasn't been pre-warmed yet (server started after it)
+    due = last_close() + pd.Timedelta(seconds=PREWARM_DELAY)
+    stale = _now() >= due and not _warmed_since(symbols, due)
+    try:
+        prewarm(symbols, params, provider, refresh=stale)
+    except Exception as e:
+        print(f"Pre-warm error: {e}")
+    while not stop.is_set():
+        wait = (next_run() - _now()).total_seconds()
+        if stop.wait(max(wait, 0)):
+            break
+        try:
+            prewarm(symbols, params, provider)
+        except Exception as e:
+            print(f"Pre-warm error: {e}")
+
+def start_background(symbols=None, params=None, provider=None):
+    # One daemon scheduler thread per process
+    global _background
+    if _background is None or not _background.is_alive():
+        _background = threading.Thread(target=run_forever, args=(symbols, params, provider),
+                                       name='prewarm', daemon=True)
+        _background.start()
+    return _background
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-warm price data and default backtests after each close')
+    parser.add_argument('symbols', nargs='*', default=WATCHLIST)
+    parser.add_argument('--once', action='store_true', help="Run now and exit")
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    symbols = [s.upper() for s in args.symbols]
+    if args.once:
+        print(pd.DataFrame(prewarm(symbols, provider=args.provider)).T.to_string())
+    else:
+        print(f"Pre-warming {', '.join(symbols)} daily at {SESSION_CLOSE} {MARKET_TZ} + {PREWARM_DELAY // 60} min "
+              f"(next: {next_run():%Y-%m-%d %H:%M %Z})")
+        run_forever(symbols, provider=args.provider)
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# ⚙️ CACHE SETTINGS
+# =========================================================
+# One Parquet file (+ small JSON sidecar) per symbol. Intraday series (millions
+# of rows) use a compact layout instead: int64 ns timestamps + float32 closes in
+# two .npy files, memory-mapped on read once they are large.
+CACHE_DIR = os.environ.get('TQ_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.price_cache'))
+CACHE_TTL = 60 * 60   # Seconds a cached series is served without asking the provider
+OVERLAP_BARS = 5      # Already-cached bars re-downloaded to detect rewritten history
+MMAP_MIN_ROWS = 1_000_000  # Compact series at least this long are memory-mapped
+COMPACT_DTYPE = np.float32
+
+
+def _paths(symbol, interval='1d'):
+    # (data path, meta path); compact data path is the .close.npy file (timestamps sit next to it)
+    base = os.path.join(CACHE_DIR, symbol.upper() if interval == '1d' else f"{symbol.upper()}_{interval}")
+    if interval == '1d':
+        return base + '.parquet', base + '.json'
+    return base + '.close.npy', base + '.json'
+
+def _ts_path(data_path):
+    return data_path[:-len('.close.npy')] + '.ts.npy'
+
+def compact(df):
+    # float32 closes: ~7 significant digits, plenty for intraday prices
+    if df.empty or df['Close'].dtype == COMPACT_DTYPE:
+        return df
+    return df.astype({'Close': COMPACT_DTYPE})
+
+def _save_npy(path, arr):
+    with open(path + '.tmp', 'wb') as f:
+        np.save(f, arr)
+    os.replace(path + '.tmp', path)
+
+def _read_compact(data_path):
+    ts_path = _ts_path(data_path)
+    rows = np.load(ts_path, mmap_mode='r').shape[0]
+    mode = 'r' if rows >= MMAP_MIN_ROWS else None
+    ts = np.load(ts_path, mmap_mode=mode)
+    close = np.load(data_path, mmap_mode=mode)
+    index = pd.DatetimeIndex(ts.view('datetime64[ns]'))
+    return pd.DataFrame({'Close': close}, index=index, copy=False)
+
+def _since(df, start):
+    # Positional slice: keeps a memory-mapped frame a view (a boolean mask would copy it)
+    return df.iloc[df.index.searchsorted(start):]
+
+def _checksum(closes):
+    # auto_adjust=True rescales the whole history after a dividend/split,
+    # so a changed overlap window means every cached bar is stale.
+    vals = np.round(np.asarray(closes, dtype='float64'), 4)
+    return hashlib.sha1(vals.tobytes()).hexdigest()
+
+def read(symbol, interval='1d'):
+    data_path, meta_path = _paths(symbol, interval)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if interval != '1d':
+        return _read_compact(data_path), meta
+    return pd.read_parquet(data_path), meta
+
+def write(symbol, df, start_date, interval='1d'):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _paths(symbol, interval)
+
+    # Write to temp files first so a crash never leaves a half-written cache
+    if interval != '1d':
+        _save_npy(_ts_path(data_path), df.index.values.astype('datetime64[ns]').view('int64'))
+        _save_npy(data_path, df['Close'].to_numpy(dtype=COMPACT_DTYPE))
+    else:
+        df.to_parquet(data_path + '.tmp')
+        os.replace(data_path + '.tmp', data_path)
+    meta = {
+        'start': pd.Timestamp(start_date).strftime('%Y-%m-%d'),
+        'last_date': df.index[-1].strftime('%Y-%m-%d'),
+        'rows': len(df),
+        'fetched_at': time.time(),
+    }
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+    return meta
+
+def clear(symbol=None, interval='1d'):
+    if symbol is None:
+        if os.path.isdir(CACHE_DIR):
+            for name in os.listdir(CACHE_DIR):
+                os.remove(os.path.join(CACHE_DIR, name))
+        return
+    data_path, meta_path = _paths(symbol, interval)
+    paths = [data_path, meta_path] + ([_ts_path(data_path)] if interval != '1d' else [])
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def read_meta(symbol, interval='1d'):
+    # Sidecar only (start / last_date / rows / fetched_at), None if not cached
+    data_path, meta_path = _paths(symbol, interval)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+def needs_fetch(symbol, start_date, ttl=None, interval='1d'):
+    # True when load() would have to ask the provider for anything
+    ttl = CACHE_TTL if ttl is None else ttl
+    meta = read_meta(symbol, interval)
+    if meta is None:
+        return True
+    if meta.get('rows', 0) == 0 or pd.Timestamp(start_date) < pd.Timestamp(meta['start']):
+        return True
+    return time.time() - meta['fetched_at'] >= ttl
+
+def load(symbol, start_date, fetch, ttl=None, info=None, interval='1d'):
+    # fetch(symbol, start_date) -> normalized 'Close' frame (see providers.py)
+    # info: optional dict; 'cache' is set to miss / hit / append / refresh / stale
+    info = {} if info is None else info
+    ttl = CACHE_TTL if ttl is None else ttl
+    start = pd.Timestamp(start_date)
+    cached, meta = read(symbol, interval)
+    if interval != '1d':
+        raw_fetch = fetch
+        fetch = lambda s, d: compact(raw_fetch(s, d))
+
+    # 1. Cold (or cache doesn't reach back far enough) -> full download
+    if cached is None or cached.empty or start < pd.Timestamp(meta['start']):
+        info['cache'] = 'miss'
+        df = fetch(symbol, start_date)
+        if not df.empty:
+            write(symbol, df, start_date, interval)
+        return df
+
+    # 2. Warm and fresh -> no network at all
+    if time.time() - meta['fetched_at'] < ttl:
+        info['cache'] = 'hit'
+        return _since(cached, start)
+
+    # 3. Stale -> only fetch the tail, re-reading a few known bars as a checksum
+    # window. The last cached bar is left out of it: it may have been a partial
+    # (intraday) bar, so it's simply overwritten by the fetched value.
+    last = cached.index[-1]
+    overlap = cached.iloc[-OVERLAP_BARS - 1:-1]
+    fresh = fetch(symbol, (overlap.index[0] if len(overlap) else last).strftime('%Y-%m-%d'))
+    if fresh.empty:
+        # Provider hiccup: serve what we have
+        info['cache'] = 'stale'
+        return _since(cached, start)
+
+    window = fresh['Close'].reindex(overlap.index)
+    # (compared at the stored precision, so float32 caches don't always look rewritten)
+    window = window.astype(overlap['Close'].dtype)
+    if window.isna().any() or _checksum(window.values) != _checksum(overlap['Close'].values):
+        # Adjusted history was rewritten -> refresh the whole series
+        info['cache'] = 'refresh'
+        df = fetch(symbol, meta['start'])
+        if df.empty:
+            info['cache'] = 'stale'
+            return _since(cached, start)
+    else:
+        info['cache'] = 'append'
+        df = pd.concat([cached.iloc[:-1], _since(fresh, last)])
+
+    write(symbol, df, meta['start'], interval)
+    return _since(df, start)
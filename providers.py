@@ -0,0 +1,207 @@
+import os
+import zlib
+import pandas as pd
+
+# =========================================================
+# 🔌 MARKET DATA PROVIDERS
+# =========================================================
+# A provider is a plain dict:
+#   name       - label shown in timings / the dashboard
+#   fetch      - fetch(symbol, start_date, interval='1d') -> normalized 'Close' frame (empty on failure)
+#   fetch_many - fetch_many(symbols, start_date, interval='1d') -> {symbol: frame}
+#   cacheable  - True if results should go through price_cache (network sources)
+# get_provider() also accepts 'yfinance', 'synthetic', 'synthetic:<seed>' and
+# 'local:<directory>' so callers (CLI flags, the dashboard) can pass a string.
+
+DEFAULT_PROVIDER = 'yfinance'
+DATA_DIR = os.environ.get('TQ_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+# Bar intervals: bar length in minutes (None = one bar per session), bars per
+# year and how far back yfinance serves the interval (None = full history)
+INTERVALS = {
+    '1d':  {"minutes": None, "bars_per_year": 252,       "yf_max_days": None},
+    '1h':  {"minutes": 60,   "bars_per_year": 252 * 7,   "yf_max_days": 729},
+    '30m': {"minutes": 30,   "bars_per_year": 252 * 13,  "yf_max_days": 59},
+    '15m': {"minutes": 15,   "bars_per_year": 252 * 26,  "yf_max_days": 59},
+    '5m':  {"minutes": 5,    "bars_per_year": 252 * 78,  "yf_max_days": 59},
+    '1m':  {"minutes": 1,    "bars_per_year": 252 * 390, "yf_max_days": 7},
+}
+
+def check_interval(interval):
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown bar interval: {interval}")
+    return interval
+
+
+def normalize(df, symbol):
+    # Handle MultiIndex Columns (typical in new yfinance)
+    if isinstance(df.columns, pd.MultiIndex):
+        # Try to fetch level 0 first if it looks like (Price, Ticker)
+        # If columns are (Price, Ticker), we want 'Close' or 'Adj Close'
+        # yf.download usually returns:
+        # Price  Adj Close   Close ...
+        # Ticker  TQQQ       TQQQ
+         try:
+             # Flatten matching symbol
+             df = df.xs(symbol, axis=1, level=1)
+         except KeyError:
+             # If symbol level missing, maybe it's level 0? Or just dropped?
+             df.columns = df.columns.droplevel(1)
+
+    # Handle duplicate columns if any
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    col = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
+    if col not in df.columns:
+        # Last ditch: take first column
+        df = df.iloc[:, [0]]
+        df.columns = ['Close']
+    else:
+        df = df[[col]].rename(columns={col: 'Close'})
+
+    df.index = df.index.tz_localize(None)
+    df = df.sort_index()
+    return df[~df.index.duplicated(keep='last')]
+
+def _fetch_each(fetch):
+    # Default fetch_many for sources without a batch endpoint
+    def fetch_many(symbols, start_date, interval='1d'):
+        return {s: fetch(s, start_date, interval) for s in symbols}
+    return fetch_many
+
+def _since(df, start_date):
+    return df[df.index >= pd.Timestamp(start_date)]
+
+# ---------------------------------------------------------
+# yfinance (network)
+# ---------------------------------------------------------
+def _yf_start(start_date, interval):
+    # Intraday history is only served for a limited window; ask for what exists
+    max_days = INTERVALS[interval]['yf_max_days']
+    if max_days is None:
+        return start_date
+    earliest = pd.Timestamp.now().normalize() - pd.Timedelta(days=max_days)
+    return max(pd.Timestamp(start_date), earliest).strftime('%Y-%m-%d')
+
+def _yf_fetch(symbol, start_date, interval='1d'):
+    import yfinance as yf
+    try:
+        df = yf.download(symbol, start=_yf_start(start_date, interval), interval=interval, progress=False, auto_adjust=True)
+        if df.empty: return pd.DataFrame()
+        return normalize(df, symbol)
+    except Exception as e:
+        print(f"Data download error: {e}")
+        return pd.DataFrame()
+
+def _yf_fetch_many(symbols, start_date, interval='1d'):
+    # One batched request; columns come back as (Price, Ticker)
+    import yfinance as yf
+    try:
+        raw = yf.download(symbols, start=_yf_start(start_date, interval), interval=interval, progress=False, auto_adjust=True)
+    except Exception as e:
+        print(f"Data download error: {e}")
+        return {}
+    out = {}
+    for symbol in symbols:
+        try:
+            if isinstance(raw.columns, pd.MultiIndex):
+                sub = raw.xs(symbol, axis=1, level=1)
+            else:
+                sub = raw
+            # Rows before a symbol's listing date are all-NaN in a batch frame
+            sub = sub.dropna(how='all')
+            out[symbol] = normalize(sub, symbol) if not sub.empty else pd.DataFrame()
+        except Exception as e:
+            print(f"Data download error ({symbol}): {e}")
+            out[symbol] = pd.DataFrame()
+    return out
+
+def yfinance_provider():
+    return {"name": "yfinance", "fetch": _yf_fetch, "fetch_many": _yf_fetch_many, "cacheable": True}
+
+# ---------------------------------------------------------
+# Local files: <directory>/<SYMBOL>.parquet or <SYMBOL>.csv
+# (intraday: <SYMBOL>_<interval>.parquet / .csv)
+# ---------------------------------------------------------
+def _parse_index(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index
+    # CSVs saved from tz-aware frames mix UTC offsets across DST; keep the
+    # exchange wall-clock time, like tz_localize(None) does for live data
+    return pd.DatetimeIndex(pd.Index(index).astype(str).str.replace(r'(Z|[+-]\d\d:?\d\d)$', '', regex=True))
+
+def local_provider(directory=DATA_DIR):
+    def fetch(symbol, start_date, interval='1d'):
+        suffix = '' if interval == '1d' else f'_{interval}'
+        for name in dict.fromkeys((symbol.upper(), symbol.lower(), symbol)):
+            path = os.path.join(directory, name + suffix)
+            try:
+                if os.path.exists(path + '.parquet'):
+                    df = pd.read_parquet(path + '.parquet')
+                elif os.path.exists(path + '.csv'):
+                    df = pd.read_csv(path + '.csv', index_col=0, parse_dates=True, float_precision='round_trip')
+                else:
+                    continue
+            except Exception as e:
+                print(f"Data file error ({path}): {e}")
+                return pd.DataFrame()
+            if df.empty:
+                return pd.DataFrame()
+            df.index = _parse_index(df.index)
+            return _since(normalize(df, symbol), start_date)
+        print(f"Data file not found: {symbol}{suffix} in {directory}")
+        return pd.DataFrame()
+    return {"name": f"local:{directory}", "fetch": fetch, "fetch_many": _fetch_each(fetch), "cacheable": False}
+
+# ---------------------------------------------------------
+# In-memory frames (tests, notebooks, pre-loaded batches)
+# ---------------------------------------------------------
+def memory_provider(frames):
+    # frames: {symbol: frame with a Close / Adj Close column}; the caller picks
+    # the bar interval, so frames are served as-is whatever interval is asked for
+    frames = {s.upper(): normalize(df, s.upper()) for s, df in frames.items() if not df.empty}
+
+    def fetch(symbol, start_date, interval='1d'):
+        df = frames.get(symbol.upper())
+        return _since(df, start_date) if df is not None else pd.DataFrame()
+    return {"name": "memory", "fetch": fetch, "fetch_many": _fetch_each(fetch), "cacheable": False}
+
+# ---------------------------------------------------------
+# Seeded synthetic series (see synthetic_data.py)
+# ---------------------------------------------------------
+def synthetic_provider(seed=0, generator='leveraged', n_bars=6500, start='2000-01-03'):
+    # Same symbol + seed -> same series; different symbols get different paths
+    import synthetic_data
+
+    def fetch(symbol, start_date, interval='1d'):
+        # Same calendar span for every interval: n_bars sessions of 9:30-16:00 bars
+        spec = INTERVALS[interval]
+        bars = n_bars * spec['bars_per_year'] // INTERVALS['1d']['bars_per_year']
+        sym_seed = seed + zlib.crc32(symbol.upper().encode())
+        df = synthetic_data.GENERATORS[generator](bars, seed=sym_seed, start=start,
+                                                  periods_per_year=spec['bars_per_year'])
+        if spec['minutes']:
+            df.index = synthetic_data.session_index(n_bars, start, spec['minutes'])[:bars]
+        return _since(df, start_date)
+    return {"name": f"synthetic:{seed}", "fetch": fetch, "fetch_many": _fetch_each(fetch), "cacheable": False}
+
+PROVIDERS = {
+    'yfinance': yfinance_provider,
+    'local': local_provider,
+    'synthetic': synthetic_provider,
+}
+
+def get_provider(spec=None):
+    # spec: None (default), a provider dict, or 'name[:arg]'
+    if spec is None:
+        spec = os.environ.get('TQ_PROVIDER', DEFAULT_PROVIDER)
+    if isinstance(spec, dict):
+        return spec
+    name, _, arg = spec.partition(':')
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown data provider: {spec}")
+    if name == 'local':
+        return local_provider(arg or DATA_DIR)
+    if name == 'synthetic':
+        return synthetic_provider(int(arg) if arg else 0)
+    return PROVIDERS[name]()
@@ -0,0 +1,90 @@
+import os
+import sys
+import csv
+import json
+import argparse
+
+# =========================================================
+# 🔔 HEADLESS SIGNAL SCANNER (cron / alerting)
+# =========================================================
+# Today's live diagnosis for a list of symbols, without the dashboard:
+#   python scan.py TQQQ SOXL UPRO --format csv --out signals.csv
+#   python scan.py --cache-only --alert-on 2 || notify-send "TQ buy signal"
+# Only the standard library is imported up front: strategy_core (pandas /
+# NumPy) loads once the arguments are parsed, yfinance only when something
+# has to be downloaded, and Plotly / Streamlit never.
+#
+# Exit status: 0 ok, EXIT_ERROR if a symbol failed, EXIT_ALERT if a symbol's
+# active_status_id (strategy_core.diagnose) is in --alert-on
+# (0=Bear 1=Wait 2=Buy 3=Hold). diagnose() only reports 4=Sell / 5=Profit for an
+# open position, and the backtest has already closed it on a sell bar, so a
+# scan never returns them; sell days show up as a change from 3 to 0 / 1.
+
+SCAN_COLS = ['symbol', 'last_date', 'active_status_id', 'status', 'message',
+             'price', 'ma', 'rsi_w', 'rsi_d', 'cagr', 'mdd', 'error']
+EXIT_ERROR = 1
+EXIT_ALERT = 2
+
+
+def scan(symbols, params=None, provider=None, cache_only=False, executor='thread', max_workers=None):
+    # One row per symbol (in the given order) with the SCAN_COLS keys.
+    # cache_only: serve cached prices however old; only symbols missing from
+    # the cache are downloaded.
+    import strategy_core
+    import universe
+
+    params = params or strategy_core.DEFAULT_PARAMS
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    data = strategy_core.get_data_many(symbols, params.get('start_date', '2020-01-01'), provider=provider,
+                                       ttl=float('inf') if cache_only else None)
+    rows = {r['symbol']: r for r in universe.iter_universe(symbols, params, executor=executor,
+                                                           max_workers=max_workers, data=data)}
+    return [{c: rows[s].get(c) for c in SCAN_COLS} for s in symbols]
+
+def write_rows(rows, fmt, out):
+    if fmt == 'json':
+        json.dump(rows, out, ensure_ascii=False, indent=1)
+        out.write('\n')
+    else:
+        writer = csv.DictWriter(out, fieldnames=SCAN_COLS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def exit_status(rows, alert_on=()):
+    if any(r['error'] for r in rows):
+        return EXIT_ERROR
+    if any(r['active_status_id'] in alert_on for r in rows):
+        return EXIT_ALERT
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print today's strategy signal for a list of symbols")
+    parser.add_argument('symbols', nargs='*', default=None, help="Default: $TQ_WATCHLIST or TQQQ")
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--out', default=None, help="Write to this file (atomically) instead of stdout")
+    parser.add_argument('--start', default=None, help="Backtest start date (default: DEFAULT_PARAMS)")
+    parser.add_argument('--cache-only', action='store_true', help="Don't refresh cached prices")
+    parser.add_argument('--alert-on', default='', help="Comma-separated status ids (0-3) that set exit status %d" % EXIT_ALERT)
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args(argv)
+
+    symbols = args.symbols or [s.strip().upper() for s in os.environ.get('TQ_WATCHLIST', 'TQQQ').split(',') if s.strip()]
+    alert_on = {int(s) for s in args.alert_on.split(',') if s.strip()}
+
+    import strategy_core
+    params = dict(strategy_core.DEFAULT_PARAMS, **({'start_date': args.start} if args.start else {}))
+    rows = scan(symbols, params, provider=args.provider, cache_only=args.cache_only,
+                executor=args.executor, max_workers=args.workers)
+
+    if args.out:
+        with open(args.out + '.tmp', 'w', newline='', encoding='utf-8') as f:
+            write_rows(rows, args.format, f)
+        os.replace(args.out + '.tmp', args.out)
+    else:
+        write_rows(rows, args.format, sys.stdout)
+    return exit_status(rows, alert_on)
+
+if __name__ == '__main__':
+    sys.exit(main())
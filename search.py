@@ -0,0 +1,242 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+import strategy_core
+import indicator_bank
+
+# =========================================================
+# 🧭 PARAMETER SEARCH (random / successive halving / surrogate)
+# =========================================================
+# All 8 strategy params are searched. Configs are evaluated together with
+# strategy_core.batch_kernel: MA/RSI columns come from one indicator bank, so
+# a batch of mixed structural params is still a single pass over time.
+
+# name: (low, high, step) - ranges follow the dashboard sliders
+SEARCH_SPACE = {
+    'ma_period': (50, 300, 1),
+    'd_period': (2, 14, 1),
+    'w_period': (10, 50, 1),
+    'w_buy_max': (30, 80, 1),
+    'd_buy_cross': (10, 50, 1),
+    'w_sell_cross': (50, 90, 1),
+    'w_profit_max': (70, 95, 1),
+    'stop_loss': (0.05, 0.30, 0.01),
+}
+PARAM_COLS = list(SEARCH_SPACE)
+METRIC_COLS = ['cagr', 'mdd', 'total_trades', 'win_rate', 'final_balance']
+
+
+# ---------------------------------------------------------
+# Objective / Pareto helpers
+# ---------------------------------------------------------
+def make_objective(metric='cagr', mdd_cap=None, min_trades=0, penalty=10.0):
+    # Score = metric, minus `penalty` per %pt the MDD goes past mdd_cap (e.g. -35).
+    # Configs with fewer than min_trades sells score -inf.
+    def objective(results):
+        score = results[metric].astype('float64').copy()
+        if mdd_cap is not None:
+            score -= penalty * np.maximum(0.0, mdd_cap - results['mdd'])
+        score[results['total_trades'] < min_trades] = -np.inf
+        return score
+    return objective
+
+def dominated_mask(results, x='cagr', y='mdd'):
+    # True where another row is at least as good on both (higher CAGR, MDD closer to 0)
+    # and strictly better on one. Sort by CAGR desc, then a running max of MDD.
+    order = np.lexsort((-results[y].to_numpy(), -results[x].to_numpy()))
+    xs = results[x].to_numpy()[order]
+    ys = results[y].to_numpy()[order]
+    dominated = np.zeros(len(results), dtype=bool)
+    best_y = -np.inf
+    best_x_at_best_y = np.inf
+    for k in range(len(order)):
+        if ys[k] < best_y or (ys[k] == best_y and xs[k] < best_x_at_best_y):
+            dominated[order[k]] = True
+        elif ys[k] > best_y:
+            best_y, best_x_at_best_y = ys[k], xs[k]
+    return dominated
+
+def pareto_front(results, x='cagr', y='mdd'):
+    front = results[~dominated_mask(results, x, y)]
+    return front.sort_values(x, ascending=False)
+
+# ---------------------------------------------------------
+# Sampling / evaluation
+# ---------------------------------------------------------
+def _snap(values, name):
+    low, high, step = SEARCH_SPACE[name]
+    values = np.clip(low + np.round((values - low) / step) * step, low, high)
+    return values.astype(int) if isinstance(step, int) else np.round(values, 6)
+
+def _cast(value, name):
+    return int(value) if isinstance(SEARCH_SPACE[name][2], int) else float(value)
+
+def sample_configs(n, rng):
+    return pd.DataFrame({
+        name: _snap(rng.uniform(low, high, n), name) for name, (low, high, _) in SEARCH_SPACE.items()
+    })
+
+def _unit(configs):
+    # Params scaled to [0, 1] (used by the surrogate's distance metric)
+    cols = []
+    for name, (low, high, _) in SEARCH_SPACE.items():
+        cols.append((configs[name].to_numpy(dtype='float64') - low) / (high - low))
+    return np.column_stack(cols)
+
+def prepare(df, start_date=strategy_core.DEFAULT_PARAMS['start_date']):
+    # One bank over the whole search space, built once per search
+    low_high = {k: range(v[0], v[1] + 1) for k, v in SEARCH_SPACE.items() if k.endswith('period')}
+    bank = indicator_bank.build_indicator_bank(df, low_high['ma_period'], low_high['d_period'], low_high['w_period'])
+    bank['start_idx'] = int(np.searchsorted(df.index.values, np.datetime64(pd.Timestamp(start_date))))
+    return bank
+
+def evaluate(bank, configs, window=None, bars=None):
+    # window: only backtest the most recent `window` bars (successive halving)
+    # bars: explicit (lo, hi) bar range into the bank (walk-forward folds)
+    close = bank['Close']
+    n = len(close)
+    if bars is not None:
+        lo, hi = bars
+    else:
+        lo = bank['start_idx'] if window is None else max(bank['start_idx'], n - window)
+        hi = n
+
+    ma = bank['MA'].iloc[lo:hi][configs['ma_period'].to_numpy()].to_numpy()
+    rsi_d = bank['RSI_D'].iloc[lo:hi][configs['d_period'].to_numpy()].to_numpy()
+    rsi_w = bank['RSI_W'].iloc[lo:hi][configs['w_period'].to_numpy()].to_numpy()
+
+    # Each config starts on its first bar with all indicators warmed up
+    valid = ~(np.isnan(ma) | np.isnan(rsi_d) | np.isnan(rsi_w))
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), len(valid) - 1)
+
+    res = strategy_core.batch_kernel(close.to_numpy(dtype='float64')[lo:hi], close.index[lo:hi],
+                                     ma, rsi_d, rsi_w, strategy_core._param_table(configs), first)
+    res.index = configs.index
+    out = configs.copy()
+    for col in METRIC_COLS:
+        out[col] = res[col]
+    return out
+
+# ---------------------------------------------------------
+# Search modes
+# ---------------------------------------------------------
+def random_search(bank, objective, n_iter=2000, batch_size=250, patience=3, rng=None):
+    # Batches of random configs; stop after `patience` batches without a better best score
+    rng = rng or np.random.default_rng()
+    frames = []
+    best, stale = -np.inf, 0
+    while sum(len(f) for f in frames) < n_iter and stale < patience:
+        res = evaluate(bank, sample_configs(batch_size, rng))
+        res['score'] = objective(res)
+        frames.append(res)
+        top = res['score'].max()
+        best, stale = (top, 0) if top > best else (best, stale + 1)
+    return pd.concat(frames, ignore_index=True)
+
+def successive_halving(bank, objective, n_configs=2000, eta=3, min_window=252, rng=None):
+    # Rung r backtests the last min_window * eta^r bars; the top 1/eta of each rung
+    # (non-dominated configs first) is promoted. The last rung uses the full history.
+    rng = rng or np.random.default_rng()
+    full = len(bank['Close']) - bank['start_idx']
+    configs = sample_configs(n_configs, rng)
+    window = min_window
+    frames = []
+    while True:
+        is_last = window >= full or len(configs) <= eta
+        res = evaluate(bank, configs, None if is_last else window)
+        res['score'] = objective(res)
+        res['window'] = full if is_last else window
+        frames.append(res)
+        if is_last:
+            break
+        res['dominated'] = dominated_mask(res)
+        keep = max(len(res) // eta, 1)
+        res = res.sort_values(['dominated', 'score'], ascending=[True, False])
+        configs = res.iloc[:keep][PARAM_COLS].reset_index(drop=True)
+        window *= eta
+    # Only the final (full history) rung is comparable across configs;
+    # attrs['evaluations'] counts the backtests of every rung
+    out = frames[-1].drop(columns='window').reset_index(drop=True)
+    out.attrs['evaluations'] = sum(len(f) for f in frames)
+    return out
+
+def surrogate_search(bank, objective, n_init=200, n_iter=1500, batch_size=50, n_candidates=5000,
+                     k=10, kappa=1.0, patience=5, rng=None):
+    # Bayesian-style loop with a k-nearest-neighbour surrogate: each round scores
+    # random candidates by (mean + kappa * spread) of their neighbours' scores and
+    # evaluates the most promising batch. Stops after `patience` rounds w/o progress.
+    rng = rng or np.random.default_rng()
+    res = evaluate(bank, sample_configs(n_init, rng))
+    res['score'] = objective(res)
+    best, stale = res['score'].max(), 0
+
+    while len(res) < n_iter and stale < patience:
+        seen = res[np.isfinite(res['score'])]
+        if len(seen) < k:
+            batch = sample_configs(batch_size, rng)
+        else:
+            cand = sample_configs(n_candidates, rng)
+            x_seen, x_cand = _unit(seen), _unit(cand)
+            d2 = (x_cand ** 2).sum(1)[:, None] - 2 * x_cand @ x_seen.T + (x_seen ** 2).sum(1)[None, :]
+            nn = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            y = seen['score'].to_numpy()[nn]
+            # Spread grows with neighbour disagreement and with distance to known points
+            dist = np.sqrt(np.maximum(np.take_along_axis(d2, nn, axis=1), 0)).mean(1)
+            acq = y.mean(1) + kappa * (y.std(1) + dist * y.std())
+            batch = cand.iloc[np.argsort(-acq)[:batch_size]].reset_index(drop=True)
+
+        out = evaluate(bank, batch)
+        out['score'] = objective(out)
+        res = pd.concat([res, out], ignore_index=True)
+        top = out['score'].max()
+        best, stale = (top, 0) if top > best else (best, stale + 1)
+    return res
+
+SEARCH_MODES = {
+    'random': random_search,
+    'halving': successive_halving,
+    'surrogate': surrogate_search,
+}
+
+def run_search(symbol=strategy_core.SYMBOL, mode='random', objective=None, start_date=strategy_core.DEFAULT_PARAMS['start_date'],
+               seed=None, df=None, **kwargs):
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    if df is None:
+        df = strategy_core.get_data(symbol, start_date)
+    if df.empty:
+        raise ValueError(f"No price data for {symbol}")
+    objective = objective or make_objective()
+
+    bank = prepare(df, start_date)
+    results = SEARCH_MODES[mode](bank, objective, rng=np.random.default_rng(seed), **kwargs)
+    evaluations = results.attrs.get('evaluations', len(results))
+    results = results.sort_values('score', ascending=False, ignore_index=True)
+    best = results.iloc[0]
+    return {
+        "symbol": symbol,
+        "mode": mode,
+        "evaluations": evaluations,
+        "best_params": {c: _cast(best[c], c) for c in PARAM_COLS},
+        "best": best.to_dict(),
+        # Never-trading configs (CAGR 0 / MDD 0) would otherwise crowd the front
+        "pareto": pareto_front(results[results['total_trades'] > 0]),
+        "results": results,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Strategy parameter search')
+    parser.add_argument('symbol', nargs='?', default=strategy_core.SYMBOL)
+    parser.add_argument('--mode', choices=list(SEARCH_MODES), default='halving')
+    parser.add_argument('--mdd-cap', type=float, default=None, help='e.g. -35 (percent)')
+    parser.add_argument('--min-trades', type=int, default=0)
+    parser.add_argument('--start', default=strategy_core.DEFAULT_PARAMS['start_date'])
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    out = run_search(args.symbol.upper(), args.mode, make_objective(mdd_cap=args.mdd_cap, min_trades=args.min_trades),
+                     args.start, args.seed, df=strategy_core.get_data(args.symbol, args.start, provider=args.provider))
+    print(f"{out['evaluations']} evaluations, best: {out['best_params']}")
+    print(out['pareto'][PARAM_COLS + ['cagr', 'mdd', 'score']].head(20).to_string(index=False))
@@ -1,8 +1,21 @@
-import yfinance as yf
+import os
+import json
+import time
+import hashlib
+import sys
+import random
+import logging
+import threading
+import collections
+from concurrent.futures import Future
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+import price_cache
+import providers
+
 # =========================================================
 # ⚙️ USER SETTINGS (Default)
 # =========================================================
@@ -13,48 +26,236 @@ INITIAL_CAPITAL = 1000  # Changed to 1000 for better decimal visibility
 # ★ 황금 파라미터 (CAGR 46% / MDD -31%)
 DEFAULT_PARAMS = {'ma_period': 192, 'd_period': 3, 'w_period': 23, 'w_buy_max': 63, 'd_buy_cross': 28, 'w_sell_cross': 68, 'w_profit_max': 83, 'stop_loss': 0.18, 'start_date': '2010-02-01'}
 
-def get_data(symbol, start_date):
+# =========================================================
+# ⏱️ INSTRUMENTATION
+# =========================================================
+# Every pipeline stage runs inside stage_timer(), which produces a record like
+#   {"stage": "indicators", "seconds": 0.012, "rows": 3900, ...}
+# Records go to the caller's list (get_strategy_data()['timings']), to a rolling
+# per-stage history (timing_stats() -> p50/p95) and to every hook in
+# TIMING_HOOKS. Set TQ_TIMING_LOG=1 to emit them as JSON log lines on stderr
+# (logger 'strategy_core.timings', with its own handler).
+TIMING_WINDOW = 200   # Records kept per stage for the rolling percentiles
+TIMING_HOOKS = []
+TIMING_HISTORY = {}
+timing_log = logging.getLogger('strategy_core.timings')
+
+def log_timing(record):
+    timing_log.info(json.dumps(record, default=str))
+
+if os.environ.get('TQ_TIMING_LOG'):
+    # Works without any logging config; not propagated, so a configured root
+    # logger doesn't print every line twice
+    if not timing_log.handlers:
+        timing_log.addHandler(logging.StreamHandler())
+    timing_log.setLevel(logging.INFO)
+    timing_log.propagate = False
+    TIMING_HOOKS.append(log_timing)
+
+@contextmanager
+def stage_timer(stage, timings=None, **info):
+    # The yielded dict can be filled with extra fields (rows, cache, ...) inside the block
+    record = {"stage": stage, **info}
+    t0 = time.perf_counter()
     try:
-        # Uppercase symbol for consistency
-        symbol = symbol.upper()
-
-        df = yf.download(symbol, start=start_date, progress=False, auto_adjust=True)
-        if df.empty: return pd.DataFrame()
-
-        # Handle MultiIndex Columns (typical in new yfinance)
-        if isinstance(df.columns, pd.MultiIndex):
-            # Try to fetch level 0 first if it looks like (Price, Ticker)
-            # If columns are (Price, Ticker), we want 'Close' or 'Adj Close'
-            # yf.download usually returns:
-            # Price  Adj Close   Close ...
-            # Ticker  TQQQ       TQQQ
-             try:
-                 # Flatten matching symbol
-                 df = df.xs(symbol, axis=1, level=1)
-             except KeyError:
-                 # If symbol level missing, maybe it's level 0? Or just dropped?
-                 df.columns = df.columns.droplevel(1)
-
-        # Handle duplicate columns if any
-        df = df.loc[:, ~df.columns.duplicated()]
-
-        col = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
-        if col not in df.columns:
-            # Last ditch: take first column
-            df = df.iloc[:, [0]]
-            df.columns = ['Close']
-        else:
-            df = df[[col]].rename(columns={col: 'Close'})
-        
-        df.index = df.index.tz_localize(None)
-        df = df.sort_index()
-        return df[~df.index.duplicated(keep='last')]
-    except Exception as e:
-        print(f"Data download error: {e}")
-        return pd.DataFrame()
+        yield record
+    finally:
+        record['seconds'] = time.perf_counter() - t0
+        record_timing(record, timings)
+
+def record_timing(record, timings=None):
+    # For stages timed by hand (e.g. the dashboard's chart building)
+    if timings is not None:
+        timings.append(record)
+    TIMING_HISTORY.setdefault(record['stage'], collections.deque(maxlen=TIMING_WINDOW)).append(record['seconds'])
+    for hook in TIMING_HOOKS:
+        try:
+            hook(record)
+        except Exception as e:
+            print(f"Timing hook error: {e}")
+
+def timing_stats():
+    # Rolling p50 / p95 (ms) per stage over the last TIMING_WINDOW runs
+    rows = []
+    for stage, hist in list(TIMING_HISTORY.items()):
+        vals = np.array(hist) * 1000
+        rows.append({"stage": stage, "runs": len(vals), "last_ms": vals[-1],
+                     "p50_ms": np.percentile(vals, 50), "p95_ms": np.percentile(vals, 95)})
+    return pd.DataFrame(rows, columns=['stage', 'runs', 'last_ms', 'p50_ms', 'p95_ms'])
+
+def _frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum()) if len(df.columns) else 0
+
+def _counting(fetch, info):
+    # Tallies what a fetch function actually pulled from the provider.
+    # yfinance doesn't expose the HTTP payload size, so bytes = in-memory frame size.
+    def wrapped(symbol, start):
+        df = fetch(symbol, start)
+        info['fetched_rows'] = info.get('fetched_rows', 0) + len(df)
+        info['download_bytes'] = info.get('download_bytes', 0) + _frame_bytes(df)
+        return df
+    return wrapped
+
+# =========================================================
+# 🚦 FETCH COORDINATION (process-wide)
+# =========================================================
+# Every Streamlit session runs in a thread of the same process. Concurrent
+# get_data calls for the same (provider, symbol, interval, start) share one
+# in-flight call; the others wait for it and get a copy of its frame (the
+# leader has filled the price cache by then). Network fetches are limited to
+# FETCH_CONCURRENCY at a time and retried with exponential backoff + full
+# jitter, since providers report throttling as an empty frame.
+FETCH_CONCURRENCY = int(os.environ.get('TQ_FETCH_CONCURRENCY', 4))
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5       # Seconds; the sleep before retry k is uniform(0, FETCH_BACKOFF * 2^k)
+FETCH_BACKOFF_MAX = 8.0
+
+_fetch_slots = threading.BoundedSemaphore(FETCH_CONCURRENCY)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _backoff(attempt):
+    return random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF * 2 ** attempt))
+
+def _throttled(fetch, info=None, empty=pd.DataFrame):
+    # Concurrency limit + retries for a network fetch; the slot is released while sleeping
+    def wrapped(*args):
+        for attempt in range(FETCH_RETRIES + 1):
+            try:
+                with _fetch_slots:
+                    out = fetch(*args)
+            except Exception as e:
+                if attempt == FETCH_RETRIES:
+                    raise
+                print(f"Fetch error (attempt {attempt + 1}): {e}")
+                out = empty()
+            if len(out) or attempt == FETCH_RETRIES:
+                return out
+            if info is not None:
+                info['retries'] = info.get('retries', 0) + 1
+            time.sleep(_backoff(attempt))
+    return wrapped
+
+def _coalesced(key, compute):
+    # (result, leader): the first caller for `key` computes, later ones wait on it
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result().copy(), False
+    try:
+        future.set_result(compute())
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+    return future.result(), True
+
+def get_data(symbol, start_date, use_cache=True, info=None, provider=None, interval='1d'):
+    # Uppercase symbol for consistency
+    symbol = symbol.upper()
+    # provider: providers.get_provider() spec (None = yfinance / $TQ_PROVIDER)
+    source = providers.get_provider(provider)
+    # interval: bar size (providers.INTERVALS); intraday closes come back as float32
+    providers.check_interval(interval)
+    # info: optional dict filled with cache status / fetched rows / download bytes
+    info = {} if info is None else info
+    info['provider'] = source['name']
+
+    load = lambda: _load_data(symbol, start_date, use_cache, info, source, interval)
+    if source['cacheable']:
+        # Only network sources are coalesced (names of local / in-memory sources aren't unique)
+        key = (source['name'], symbol, interval, str(pd.Timestamp(start_date)), use_cache)
+        df, leader = _coalesced(key, load)
+        if not leader:
+            # Served by another session's download
+            info['cache'] = 'inflight'
+    else:
+        df = load()
+    info['rows'] = len(df)
+    return df
+
+def _load_data(symbol, start_date, use_cache, info, source, interval):
+    raw_fetch = lambda s, d: source['fetch'](s, d, interval)
+    if source['cacheable']:
+        raw_fetch = _throttled(raw_fetch, info)
+    fetch = _counting(raw_fetch, info)
+
+    if not use_cache or not source['cacheable']:
+        # Local / synthetic sources are already fast; keep them out of the download cache
+        info['cache'] = 'off'
+        df = fetch(symbol, start_date)
+        if interval != '1d':
+            df = price_cache.compact(df)
+    else:
+        try:
+            df = price_cache.load(symbol, start_date, fetch, info=info, interval=interval)
+        except Exception as e:
+            # A broken cache must never block the dashboard: fall back to the network
+            print(f"Price cache error: {e}")
+            info['cache'] = 'error'
+            df = fetch(symbol, start_date)
+    return df
+
+def get_data_many(symbols, start_date, use_cache=True, provider=None, interval='1d', ttl=None):
+    # {symbol: frame} for a list of symbols, with a single batched download
+    # for every symbol the cache can't serve on its own.
+    # ttl: cache freshness override in seconds (0 = always ask the provider for new bars)
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    source = providers.get_provider(provider)
+    providers.check_interval(interval)
+    fetch_one, fetch_many = source['fetch'], source['fetch_many']
+    if source['cacheable']:
+        fetch_one, fetch_many = _throttled(fetch_one), _throttled(fetch_many, empty=dict)
+    use_cache = use_cache and source['cacheable']
+    need = [s for s in symbols if not use_cache or price_cache.needs_fetch(s, start_date, ttl, interval)]
+    batch = fetch_many(need, start_date, interval) if need else {}
+    if not use_cache:
+        out = {s: batch.get(s, pd.DataFrame()) for s in symbols}
+        return out if interval == '1d' else {s: price_cache.compact(df) for s, df in out.items()}
+
+    def fetch(symbol, start):
+        # Serve the cache's requests from the batch when it covers them
+        df = batch.get(symbol)
+        if df is not None and pd.Timestamp(start) >= pd.Timestamp(start_date):
+            return df[df.index >= pd.Timestamp(start)] if not df.empty else df
+        return fetch_one(symbol, start, interval)
+
+    out = {}
+    for symbol in symbols:
+        try:
+            out[symbol] = price_cache.load(symbol, start_date, fetch, ttl=ttl, interval=interval)
+        except Exception as e:
+            print(f"Price cache error: {e}")
+            out[symbol] = fetch(symbol, start_date)
+    return out
+
+# Slower timeframe behind the "weekly" RSI for each bar interval.
+# params may carry 'interval' (default '1d') and 'htf_rule' (overrides this map).
+HTF_RULES = {'1d': 'W-FRI', '1h': '1D', '30m': '1D', '15m': '1D', '5m': '1h', '1m': '1h'}
+
+def _htf_rule(p):
+    return p.get('htf_rule') or HTF_RULES[p.get('interval', '1d')]
+
+def _htf_rsi(close, rule, period):
+    # Slower-timeframe RSI on the last bar of each bin (the bar that closes it),
+    # forward-filled in between. Bins with no bars (nights, weekends) are skipped.
+    pos = pd.Series(np.arange(len(close)), index=close.index).resample(rule).last().dropna().to_numpy('int64')
+    c_w = pd.Series(close.to_numpy()[pos])
+    d_w = c_w.diff()
+    g_w = (d_w.where(d_w > 0, 0)).rolling(period).mean()
+    l_w = (-d_w.where(d_w < 0, 0)).rolling(period).mean()
+    rsi = np.full(len(close), np.nan)
+    rsi[pos] = (100 - (100 / (1 + g_w / l_w))).to_numpy()
+    return pd.Series(rsi, index=close.index).ffill()
 
 def calculate_indicators(df, p):
-    df = df.copy()
+    # Intraday closes may be stored as float32; indicators run in float64
+    # (a float64 copy of what's passed in; backtest_chunked passes one chunk)
+    df = df.astype({'Close': 'float64'})
     df['MA'] = df['Close'].rolling(p['ma_period']).mean()
 
     delta = df['Close'].diff()
@@ -63,6 +264,12 @@ def calculate_indicators(df, p):
     rs = gain / loss
     df['RSI_D'] = 100 - (100 / (1 + rs))
 
+    rule = _htf_rule(p)
+    if p.get('interval', '1d') != '1d' or rule != 'W-FRI':
+        df['RSI_W'] = _htf_rsi(df['Close'], rule, p['w_period'])
+        return df.dropna()
+
+    # Daily bars / W-FRI: weekly value lands on the Friday label, empty weeks included
     df_w = df.resample('W-FRI').last()
     d_w = df_w['Close'].diff()
     g_w = (d_w.where(d_w > 0, 0)).rolling(p['w_period']).mean()
@@ -73,25 +280,18 @@ def calculate_indicators(df, p):
     df['RSI_W'] = df_w['RSI_W'].reindex(df.index).ffill()
     return df.dropna()
 
-def get_strategy_data(symbol=SYMBOL, params=None):
-    if params is None:
-        params = DEFAULT_PARAMS
+def _date_format(dates):
+    # Daily bars keep plain dates; intraday bars get the time of day as well
+    ns = np.asarray(dates.values, dtype='datetime64[ns]').view('int64')
+    return "%Y-%m-%d" if not (ns % 86_400_000_000_000).any() else "%Y-%m-%d %H:%M"
 
-    start_date = params.get('start_date', '2020-01-01')
-    df_raw = get_data(symbol, start_date)
-    if df_raw.empty:
-        return {"error": "Failed to download data"}
-
-    df = calculate_indicators(df_raw, params)
-
-    # Backtest
-    start_date = params.get('start_date', '2020-01-01')
-    df_bt = df[df.index >= pd.to_datetime(start_date)].copy()
+def _backtest_loop(df_bt, params):
     prices = df_bt['Close'].values
     ma_vals = df_bt['MA'].values
     rsi_d = df_bt['RSI_D'].values
     rsi_w = df_bt['RSI_W'].values
     dates = df_bt.index
+    fmt = _date_format(dates)
 
     balance = INITIAL_CAPITAL
     shares = 0
@@ -115,7 +315,7 @@ def get_strategy_data(symbol=SYMBOL, params=None):
 
         if i == 0:
             equity_curve.append({
-                "date": curr_date.strftime("%Y-%m-%d"),
+                "date": curr_date.strftime(fmt),
                 "equity": round(float(curr_eq), 2),
                 "price": round(float(price), 2),
                 "ma": round(float(ma), 2),
@@ -145,7 +345,7 @@ def get_strategy_data(symbol=SYMBOL, params=None):
                     last_buy_price = price
                     last_buy_date = curr_date
                     trades.append({
-                        'date': curr_date.strftime("%Y-%m-%d"),
+                        'date': curr_date.strftime(fmt),
                         'type': 'Buy',
                         'price': round(float(price), 2),
                         'size': round(float(shares), 4)
@@ -179,7 +379,7 @@ def get_strategy_data(symbol=SYMBOL, params=None):
                 reason = 'MA Break' if cond_ma else (
                     'Stop Loss' if cond_stop else ('Profit Max' if cond_profit else 'Trend Broken'))
                 trades.append({
-                    'date': curr_date.strftime("%Y-%m-%d"),
+                    'date': curr_date.strftime(fmt),
                     'type': 'Sell',
                     'price': round(float(price), 2),
                     'reason': reason,
@@ -196,7 +396,7 @@ def get_strategy_data(symbol=SYMBOL, params=None):
             curr_eq = balance
 
         equity_curve.append({
-            "date": curr_date.strftime("%Y-%m-%d"),
+            "date": curr_date.strftime(fmt),
             "equity": round(float(curr_eq), 2),
             "price": round(float(price), 2),
             "ma": round(float(ma), 2),
@@ -205,23 +405,409 @@ def get_strategy_data(symbol=SYMBOL, params=None):
             "s": daily_status
         })
 
+    return equity_curve, trades, win_count, in_pos
 
-    final_val = equity_curve[-1]['equity']
-    total_days = (dates[-1] - dates[0]).days
-    years = total_days / 365.25
-    cagr = (final_val / INITIAL_CAPITAL) ** (1 / years) - 1 if years > 0 else 0
-    
-    # Calculate MDD
-    eq_series = pd.Series([e['equity'] for e in equity_curve])
-    running_max = eq_series.cummax()
-    drawdown = (eq_series - running_max) / running_max
-    mdd = drawdown.min()
+def _resolve_trades(prices, buy_idx, exit_idx, stop_loss, open_ref=None):
+    # Entry/exit bar pairs. Stop loss depends on the entry price, so it is
+    # scanned only over the bars between an entry and its next signal exit.
+    # open_ref: entry price of a position already open at bar 0 (chunked runs)
+    n = len(prices)
+    entries, exits, stops = [], [], []
+    i = 1
+    while True:
+        if open_ref is not None:
+            b, ref_price, open_ref = 0, open_ref, None
+        else:
+            k = np.searchsorted(buy_idx, i)
+            if k == len(buy_idx):
+                break
+            b = buy_idx[k]
+            ref_price = prices[b]
+        k = np.searchsorted(exit_idx, b + 1)
+        e = exit_idx[k] if k < len(exit_idx) else n
 
-    # Live Diagnosis
-    last_idx = df.index[-1]
-    today_row = df.iloc[-1]
-    prev_row = df.iloc[-2]
+        hit_stop = False
+        if ref_price > 0:
+            seg = prices[b + 1:min(e + 1, n)]
+            hits = np.flatnonzero(((seg - ref_price) / ref_price) < -stop_loss)
+            if len(hits) and b + 1 + hits[0] <= e:
+                e = b + 1 + hits[0]
+                hit_stop = True
+
+        entries.append(b)
+        if e >= n:
+            break
+        exits.append(e)
+        stops.append(hit_stop)
+        i = e + 1
+    return entries, exits, stops
+
+def _backtest_vectorized(df_bt, params, output='records', carry=None):
+    # Same rules as _backtest_loop, but resolved with masks + index searches.
+    # Python only iterates per trade (not per bar), so cost is O(bars) numpy work.
+    # carry: chunked runs pass the state left by the previous chunk; bar 0 is
+    # then that chunk's last bar (already processed) and carry is updated in place.
+    prices = df_bt['Close'].values
+    ma_vals = df_bt['MA'].values
+    rsi_d = df_bt['RSI_D'].values
+    rsi_w = df_bt['RSI_W'].values
+    dates = df_bt.index
+    fmt = _date_format(dates)
+    n = len(prices)
+    if n == 0:
+        return ({} if output == 'columnar' else []), [], 0, False
+
+    prev_rd = np.concatenate(([np.nan], rsi_d[:-1]))
+    prev_rw = np.concatenate(([np.nan], rsi_w[:-1]))
+    is_up = prices > ma_vals
+
+    # 1. Signal masks (bar 0 never trades)
+    buy_sig = is_up & (rsi_w < params['w_buy_max']) & (prev_rd < params['d_buy_cross']) & (rsi_d >= params['d_buy_cross'])
+    cond_ma = ~is_up
+    cond_trend = (prev_rw > params['w_sell_cross']) & (rsi_w <= params['w_sell_cross'])
+    cond_profit = rsi_w >= params['w_profit_max']
+    exit_sig = cond_ma | cond_trend | cond_profit
+    buy_sig[0] = exit_sig[0] = False
+    buy_idx = np.flatnonzero(buy_sig)
+    exit_idx = np.flatnonzero(exit_sig)
+
+    # 2. Resolve entries/exits
+    open_ref = carry['last_buy_price'] if carry and carry['in_pos'] else None
+    entries, exits, stops = _resolve_trades(prices, buy_idx, exit_idx, params['stop_loss'], open_ref)
+
+    # 3. Equity + status arrays
+    status = is_up.astype(np.int8)
+    balance = carry['balance'] if carry else INITIAL_CAPITAL
+    equity = np.full(n, float(balance))
+    trades = []
+    win_count = 0
+    for t, b in enumerate(entries):
+        if open_ref is not None and t == 0:
+            # Position carried over from the previous chunk
+            price_b, shares, date_b = open_ref, carry['shares'], pd.Timestamp(carry['last_buy_date'])
+        else:
+            price_b = prices[b]
+            shares = balance / price_b
+            date_b = dates[b]
+            trades.append({
+                'date': dates[b].strftime(fmt),
+                'type': 'Buy',
+                'price': round(float(price_b), 2),
+                'size': round(float(shares), 4)
+            })
+            status[b] = 2
+        if t == len(exits):
+            # Still holding at the last bar
+            equity[b:] = shares * prices[b:]
+            status[b + 1:] = 3
+            break
+
+        e = exits[t]
+        price_e = prices[e]
+        equity[b:e + 1] = shares * prices[b:e + 1]
+        status[b + 1:e] = 3
+        balance = shares * price_e
+        equity[e + 1:] = balance
+
+        cond_stop = stops[t]
+        if cond_profit[e]: status[e] = 4
+        elif cond_stop: status[e] = 5
+        else: status[e] = 6
+        if price_e > price_b:
+            win_count += 1
+        reason = 'MA Break' if cond_ma[e] else (
+            'Stop Loss' if cond_stop else ('Profit Max' if cond_profit[e] else 'Trend Broken'))
+        profit_pct = ((price_e - price_b) / price_b * 100) if price_b > 0 else 0
+        trades.append({
+            'date': dates[e].strftime(fmt),
+            'type': 'Sell',
+            'price': round(float(price_e), 2),
+            'reason': reason,
+            'balance': round(float(balance), 2),
+            'holding_days': (dates[e] - date_b).days,
+            'profit_pct': round(float(profit_pct), 2)
+        })
+    status[0] = 0
+
+    in_pos = len(entries) > len(exits)
+    if carry is not None:
+        carry['in_pos'] = in_pos
+        carry['balance'] = float(balance)
+        if in_pos and not (open_ref is not None and len(entries) == 1):
+            b = entries[-1]
+            carry.update(shares=float(balance / prices[b]), last_buy_price=float(prices[b]),
+                         last_buy_date=dates[b].isoformat())
+
+    columns = {
+        "date": dates.values.astype("datetime64[ns]"),
+        "equity": equity,
+        "price": prices,
+        "ma": ma_vals,
+        "rsi_w": rsi_w,
+        "rsi_d": rsi_d,
+        "s": status,
+    }
+    curve = columns if output == 'columnar' else _curve_records(columns)
+    return curve, trades, win_count, in_pos
+
+def _curve_records(columns):
+    # Columnar curve -> list-of-dicts equity_curve
+    # (Python round() keeps the output identical to _backtest_loop)
+    n = len(columns['equity'])
+    date_idx = pd.DatetimeIndex(columns['date'])
+    date_strs = list(date_idx.strftime(_date_format(date_idx)))
+    eq_r = [round(x, 2) for x in columns['equity'].tolist()]
+    px_r = [round(x, 2) for x in columns['price'].tolist()]
+    ma_r = [round(x, 2) for x in columns['ma'].tolist()]
+    rw_r = [round(x, 2) for x in columns['rsi_w'].tolist()]
+    rd_r = [round(x, 2) for x in columns['rsi_d'].tolist()]
+    if n:
+        rw_r[0] = rd_r[0] = 0
+    s_list = columns['s'].tolist()
+    return [
+        {"date": date_strs[i], "equity": eq_r[i], "price": px_r[i], "ma": ma_r[i],
+         "rsi_w": rw_r[i], "rsi_d": rd_r[i], "s": s_list[i]}
+        for i in range(n)
+    ]
+
+def _curve_columns(df_bt, records):
+    # list-of-dicts equity_curve (loop engine) -> columnar curve
+    # (equity here is the loop's cent-rounded value)
+    return {
+        "date": df_bt.index.values.astype("datetime64[ns]"),
+        "equity": np.array([e['equity'] for e in records], dtype='float64'),
+        "price": df_bt['Close'].to_numpy(dtype='float64'),
+        "ma": df_bt['MA'].to_numpy(dtype='float64'),
+        "rsi_w": df_bt['RSI_W'].to_numpy(dtype='float64'),
+        "rsi_d": df_bt['RSI_D'].to_numpy(dtype='float64'),
+        "s": np.array([e['s'] for e in records], dtype=np.int8),
+    }
+
+def _curve_compact(columns):
+    # Columnar curve -> compact curve: float32 values, int8 status and the date
+    # as int32 days since 1970-01-01 (Arrow date32 layout); intraday bars add
+    # the int16 minute of the day
+    ns = np.asarray(columns['date'], dtype='datetime64[ns]').view('int64')
+    day, rest = np.divmod(ns, 86_400_000_000_000)
+    out = {"day": day.astype(np.int32)}
+    if rest.any():
+        out['minute'] = (rest // 60_000_000_000).astype(np.int16)
+    for c in ['equity', 'price', 'ma', 'rsi_w', 'rsi_d']:
+        out[c] = columns[c].astype(np.float32)
+    out['s'] = columns['s'].astype(np.int8, copy=False)
+    return out
+
+def compact_dates(curve):
+    # Compact curve -> datetime64[ns] bar dates
+    dates = curve['day'].astype('datetime64[D]').astype('datetime64[ns]')
+    if 'minute' in curve:
+        dates = dates + curve['minute'].astype('timedelta64[m]')
+    return dates
+
+# =========================================================
+# 🗄️ RESULT CACHE (process-wide)
+# =========================================================
+# get_strategy_data results shared by every caller / session in the process.
+# Key: symbol + normalized params + run options + a fingerprint of the price
+# frame (row count + hash of every bar's date and close). New bars give a new key,
+# and storing it drops the entry the same (symbol, params, options) had for
+# older data. LRU eviction keeps the estimated size under RESULT_CACHE_BYTES.
+# Hits are shallow copies: nested lists / arrays are shared, don't mutate them.
+RESULT_CACHE_BYTES = int(float(os.environ.get('TQ_RESULT_CACHE_MB', 256)) * 2 ** 20)
+
+_results = collections.OrderedDict()   # key -> (result, bytes, base key)
+_result_latest = {}                    # base key -> key of its newest data
+_results_lock = threading.Lock()
+_result_counters = collections.Counter()
+
+def _approx_bytes(obj):
+    # Rough deep size: arrays / frames exactly, lists extrapolated from their ends
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, pd.DataFrame):
+        return _frame_bytes(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_approx_bytes(k) + _approx_bytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        if not obj:
+            return sys.getsizeof(obj)
+        return sys.getsizeof(obj) + len(obj) * (_approx_bytes(obj[0]) + _approx_bytes(obj[-1])) // 2
+    return sys.getsizeof(obj)
+
+def _param_key(params):
+    p = {'interval': '1d', 'start_date': '2020-01-01', **params}
+    p['start_date'] = pd.Timestamp(p['start_date']).isoformat()
+    return tuple(sorted((k, v.item() if isinstance(v, np.generic) else v) for k, v in p.items()))
+
+def _data_key(df):
+    # Whole-series fingerprint: a provider rewriting history (split / dividend
+    # adjustment, corrections) changes it even if the ends stay the same
+    digest = hashlib.sha1(np.asarray(df.index.values, dtype='datetime64[ns]').view('int64').tobytes())
+    digest.update(np.ascontiguousarray(df['Close'].to_numpy(dtype='float64')).tobytes())
+    return (len(df), digest.hexdigest())
+
+def _result_key(symbol, params, df_raw, engine, output, chunk_bars):
+    # (base key, full key): base identifies the run, full adds the data it ran on
+    base = (symbol, _param_key(params), engine, output, chunk_bars)
+    return base, base + (_data_key(df_raw),)
+
+def _drop_result(key):
+    _, size, base = _results.pop(key)
+    _result_counters['bytes'] -= size
+    if _result_latest.get(base) == key:
+        del _result_latest[base]
+
+def _result_get(key):
+    with _results_lock:
+        entry = _results.get(key)
+        if entry is None:
+            _result_counters['misses'] += 1
+            return None
+        _results.move_to_end(key)
+        _result_counters['hits'] += 1
+        return entry[0]
+
+def _result_put(base, key, result):
+    size = _approx_bytes(result)
+    with _results_lock:
+        old = _result_latest.get(base)
+        if old is not None and old != key and old in _results:
+            # Computed on older data
+            _drop_result(old)
+            _result_counters['invalidations'] += 1
+        if size > RESULT_CACHE_BYTES or key in _results:
+            return
+        _results[key] = (result, size, base)
+        _result_latest[base] = key
+        _result_counters['bytes'] += size
+        while _result_counters['bytes'] > RESULT_CACHE_BYTES:
+            _drop_result(next(iter(_results)))
+            _result_counters['evictions'] += 1
+
+def result_cache_stats():
+    with _results_lock:
+        c = dict(_result_counters)
+        entries = len(_results)
+    lookups = c.get('hits', 0) + c.get('misses', 0)
+    return {
+        "entries": entries,
+        "bytes": c.get('bytes', 0),
+        "budget_bytes": RESULT_CACHE_BYTES,
+        "hits": c.get('hits', 0),
+        "misses": c.get('misses', 0),
+        "evictions": c.get('evictions', 0),
+        "invalidations": c.get('invalidations', 0),
+        "hit_rate": round(c.get('hits', 0) / lookups * 100, 1) if lookups else 0.0,
+    }
+
+def lookup_result(symbol, params, df_raw, engine='loop', output='records', chunk_bars=None):
+    # Cached get_strategy_data result for this exact run and data (without 'timings'), else None
+    if df_raw is None or df_raw.empty:
+        return None
+    return _result_get(_result_key(symbol, params, df_raw, engine, output, chunk_bars)[1])
+
+def store_result(symbol, params, df_raw, result, engine='loop', output='records', chunk_bars=None):
+    # Counterpart of lookup_result for callers that run the stages themselves
+    if df_raw is None or df_raw.empty or 'error' in result:
+        return
+    result = {k: v for k, v in result.items() if k != 'timings'}
+    _result_put(*_result_key(symbol, params, df_raw, engine, output, chunk_bars), result)
 
+def clear_result_cache():
+    with _results_lock:
+        _results.clear()
+        _result_latest.clear()
+        _result_counters.clear()
+
+# =========================================================
+# 🧱 PIPELINE STAGES
+# =========================================================
+# fetch (get_data) -> indicators (calculate_indicators) -> run_backtest -> summarize
+# Each stage depends only on the params listed here, so callers (e.g. the
+# dashboard) can cache them separately.
+INDICATOR_KEYS = ['ma_period', 'd_period', 'w_period']
+BACKTEST_KEYS = ['start_date', 'w_buy_max', 'd_buy_cross', 'w_sell_cross', 'w_profit_max', 'stop_loss']
+
+# output='records': equity_curve is a list of per-bar dicts (string dates, rounded)
+# output='columnar': equity_curve is a dict of NumPy arrays - date (datetime64),
+#   equity/price/ma/rsi_w/rsi_d (float64, unrounded) and s (int8 status)
+# output='compact': columnar at half the size for archiving sweeps - float32
+#   values, int8 status, int32 'day' (+ int16 'minute' for intraday) instead
+#   of date (compact_dates() converts back); metrics still come from float64
+OUTPUT_MODES = ['records', 'columnar', 'compact']
+
+def run_backtest(df, params, engine='loop', output='records'):
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {output}")
+    start_date = params.get('start_date', '2020-01-01')
+    df_bt = df[df.index >= pd.to_datetime(start_date)].copy()
+    columnar = 'records' if output == 'records' else 'columnar'
+    if engine == 'loop':
+        equity_curve, trades, win_count, in_pos = _backtest_loop(df_bt, params)
+        if columnar == 'columnar':
+            equity_curve = _curve_columns(df_bt, equity_curve)
+    elif engine == 'vectorized':
+        equity_curve, trades, win_count, in_pos = _backtest_vectorized(df_bt, params, columnar)
+    else:
+        raise ValueError(f"Unknown backtest engine: {engine}")
+    return {
+        "df_bt": df_bt,
+        "equity_curve": equity_curve,
+        "trades": trades,
+        "win_count": win_count,
+        "in_pos": in_pos,
+        "output": output,
+    }
+
+def get_strategy_data(symbol=SYMBOL, params=None, engine='loop', df_raw=None, output='records', provider=None,
+                      chunk_bars=None, use_result_cache=True):
+    # params may also set 'interval' (bar size, default '1d') and 'htf_rule'.
+    # chunk_bars: stream indicators + backtest in chunks (bounded memory, no equity_curve)
+    # use_result_cache: serve / store the result in the process-wide result cache
+    if params is None:
+        params = DEFAULT_PARAMS
+
+    start_date = params.get('start_date', '2020-01-01')
+    timings = []
+    with stage_timer('fetch', timings, symbol=symbol) as rec:
+        if df_raw is None:
+            df_raw = get_data(symbol, start_date, info=rec, provider=provider, interval=params.get('interval', '1d'))
+        else:
+            rec.update(cache='provided', rows=len(df_raw))
+    if df_raw.empty:
+        return {"error": "Failed to download data", "timings": timings}
+
+    if use_result_cache:
+        base, key = _result_key(symbol, params, df_raw, engine, output, chunk_bars)
+        with stage_timer('result_cache', timings) as rec:
+            cached = _result_get(key)
+            rec['hit'] = cached is not None
+        if cached is not None:
+            return {**cached, "timings": timings}
+
+    if chunk_bars:
+        with stage_timer('backtest_chunked', timings, chunk_bars=chunk_bars) as rec:
+            result = backtest_chunked(df_raw, params, chunk_bars, symbol)
+            rec.update(rows=result.get('bars'), chunks=result.get('chunks'))
+    else:
+        with stage_timer('indicators', timings) as rec:
+            df = calculate_indicators(df_raw, params)
+            rec['rows'] = len(df)
+        if df.empty or df.index[-1] < pd.to_datetime(start_date):
+            # Nothing to trade after the indicator warm-up / start_date
+            return {"error": "Not enough data", "timings": timings}
+        with stage_timer('backtest', timings, engine=engine, output=output) as rec:
+            bt = run_backtest(df, params, engine, output)
+            rec.update(rows=len(bt['df_bt']), trades=len(bt['trades']))
+        with stage_timer('summarize', timings):
+            result = summarize(symbol, df, bt, params)
+    if use_result_cache:
+        _result_put(base, key, result)
+    return {**result, "timings": timings}
+
+def diagnose(today_row, prev_row, params, in_pos):
+    # Live diagnosis for the last bar. Rows are anything indexable by
+    # 'Close' / 'MA' / 'RSI_D' / 'RSI_W' (DataFrame rows or plain dicts).
     curr_p = float(today_row['Close'])
     curr_ma = float(today_row['MA'])
     cur_rd = float(today_row['RSI_D'])
@@ -265,10 +851,6 @@ def get_strategy_data(symbol=SYMBOL, params=None):
 
 
 
-    # Calculate win stats
-    total_trades = len([t for t in trades if t['type'] == 'Sell'])
-    win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
-
     # Determine Active Status ID (0=Bearish, 1=Wait, 2=Buy, 3=Hold, 4=Sell, 5=Profit)
     active_status_id = 1 # Default to Wait
     
@@ -280,7 +862,7 @@ def get_strategy_data(symbol=SYMBOL, params=None):
         # Check if any sell signal is active TODAY
         if cond_profit_max:
              active_status_id = 5 # Profit
-        elif cond_trend_break or cond_ma: # MA Break is also a sell signal
+        elif cond_trend_break:
              active_status_id = 4 # Sell
         else:
              active_status_id = 3 # Hold
@@ -288,6 +870,56 @@ def get_strategy_data(symbol=SYMBOL, params=None):
         # Bullish but no signal and not in pos -> Wait
         active_status_id = 1
 
+    return {
+        "price": round(float(curr_p), 2),
+        "ma": round(float(curr_ma), 2),
+        "rsi_w": round(float(cur_rw), 1),
+        "rsi_d": round(float(cur_rd), 1),
+        "status": status_label,
+        "status_color": status_color,
+        "message": action_msg,
+        # Boolean Flags for Icons
+        "is_bull": bool(is_bull),
+        "is_rsi_w_safe": bool(cur_rw < params['w_buy_max']),
+        "is_rsi_d_cross": bool((pre_rd < params['d_buy_cross']) and (cur_rd >= params['d_buy_cross'])),
+        "cond_buy": bool(cond_buy),
+        "cond_trend_break": bool(cond_trend_break),
+        "cond_profit_max": bool(cond_profit_max),
+        "active_status_id": int(active_status_id) # 0..5
+    }
+
+def summarize(symbol, df, bt, params):
+    # Metrics + live diagnosis from the indicator frame and a run_backtest() result
+    equity_curve, trades = bt['equity_curve'], bt['trades']
+    win_count, in_pos = bt['win_count'], bt['in_pos']
+    prices = bt['df_bt']['Close'].values
+    dates = bt['df_bt'].index
+
+    if isinstance(equity_curve, dict):
+        # Columnar: metrics on cent-rounded equity, same as the records path
+        eq_vals = np.round(equity_curve['equity'], 2)
+    else:
+        eq_vals = np.array([e['equity'] for e in equity_curve])
+
+    final_val = float(eq_vals[-1])
+    total_days = (dates[-1] - dates[0]).days
+    years = total_days / 365.25
+    cagr = (final_val / INITIAL_CAPITAL) ** (1 / years) - 1 if years > 0 else 0
+    
+    # Calculate MDD
+    running_max = np.maximum.accumulate(eq_vals)
+    drawdown = (eq_vals - running_max) / running_max
+    mdd = float(drawdown.min())
+
+    # Live Diagnosis
+    last_idx = df.index[-1]
+    fmt = _date_format(df.index)
+    diagnosis = diagnose(df.iloc[-1], df.iloc[-2], params, in_pos)
+
+    # Calculate win stats
+    total_trades = len([t for t in trades if t['type'] == 'Sell'])
+    win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
+
     # Benchmarks (Buy & Hold)
     bnh_start = 0
     bnh_first_buy = 0
@@ -313,8 +945,8 @@ def get_strategy_data(symbol=SYMBOL, params=None):
 
     return {
         "symbol": symbol,
-        "start_date": dates[0].strftime("%Y-%m-%d"),
-        "last_date": last_idx.strftime("%Y-%m-%d"),
+        "start_date": dates[0].strftime(fmt),
+        "last_date": last_idx.strftime(fmt),
         "final_balance": round(final_val, 0),
         "bnh_start": round(bnh_start if bnh_start == bnh_start else 0, 0),       # New: Handle NaN
         "bnh_first_buy": round(bnh_first_buy if bnh_first_buy == bnh_first_buy else 0, 0), # New: Handle NaN
@@ -324,24 +956,269 @@ def get_strategy_data(symbol=SYMBOL, params=None):
         "total_trades": total_trades,
         "win_count": win_count,
         "win_rate": round(win_rate, 1),
-        "diagnosis": {
-            "price": round(float(curr_p), 2),
-            "ma": round(float(curr_ma), 2),
-            "rsi_w": round(float(cur_rw), 1),
-            "rsi_d": round(float(cur_rd), 1),
-            "status": status_label,
-            "status_color": status_color,
-            "message": action_msg,
-            # Boolean Flags for Icons
-            "is_bull": bool(is_bull),
-            "is_rsi_w_safe": bool(cur_rw < params['w_buy_max']),
-            "is_rsi_d_cross": bool((pre_rd < params['d_buy_cross']) and (cur_rd >= params['d_buy_cross'])),
-            "cond_buy": bool(cond_buy),
-            "cond_trend_break": bool(cond_trend_break),
-            "cond_profit_max": bool(cond_profit_max),
-            "active_status_id": int(active_status_id) # 0..5
-        },
+        "diagnosis": diagnosis,
         "trades": trades[::-1], # Newest first
-        "equity_curve": equity_curve
+        "equity_curve": _curve_compact(equity_curve) if bt.get('output') == 'compact' and equity_curve else equity_curve
     }
 
+
+# =========================================================
+# 🧩 CHUNKED (STREAMING) BACKTEST
+# =========================================================
+# For long intraday series: indicators + backtest run over chunk_bars bars at a
+# time. Each chunk re-reads only the warm-up tail its rolling windows need and
+# the position / metric state is carried across chunk boundaries, so memory
+# stays O(chunk) however long the (memory-mapped) price series is.
+CHUNK_BARS = 250_000
+HTF_WARMUP_BINS = 4   # Extra slow-timeframe bins re-read per chunk (holiday-shortened weeks)
+
+def new_chunk_state():
+    return {
+        "in_pos": False,
+        "balance": float(INITIAL_CAPITAL),
+        "shares": 0.0,
+        "last_buy_price": 0.0,
+        "last_buy_date": None,
+        "rows": [],             # last two indicator rows (carry bar + diagnosis)
+        "first_date": None,
+        "first_price": None,
+        "first_buy_price": 0.0,
+        "equity": float(INITIAL_CAPITAL),
+        "peak": None,
+        "mdd": 0.0,
+        "win_count": 0,
+        "trades": [],
+        "bars": 0,
+        "chunks": 0,
+    }
+
+def _chunk_bounds(index, p, chunk_bars):
+    # (warm-up start, first bar, end) positions of each chunk
+    n = len(index)
+    bin_first = pd.Series(np.arange(n), index=index).resample(_htf_rule(p)).first().dropna().to_numpy('int64')
+    lookback = max(p['ma_period'], p['d_period'] + 1)
+    for lo in range(0, n, chunk_bars):
+        k = max(np.searchsorted(bin_first, lo, 'right') - 1 - (p['w_period'] + HTF_WARMUP_BINS), 0)
+        yield max(min(lo - lookback, bin_first[k]), 0), lo, min(lo + chunk_bars, n)
+
+def _row_dict(ts, row):
+    return {"date": ts.isoformat(), "Close": float(row['Close']), "MA": float(row['MA']),
+            "RSI_D": float(row['RSI_D']), "RSI_W": float(row['RSI_W'])}
+
+def iter_backtest_chunks(df_raw, params=None, chunk_bars=CHUNK_BARS, state=None):
+    # Yields (columnar curve, trades, state) for each chunk of df_raw (a get_data frame)
+    if params is None:
+        params = DEFAULT_PARAMS
+    state = new_chunk_state() if state is None else state
+    start = pd.to_datetime(params.get('start_date', '2020-01-01'))
+    n = len(df_raw)
+    for warm, lo, hi in _chunk_bounds(df_raw.index, params, chunk_bars):
+        # One bar past the chunk, so its last bar isn't mistaken for the end of a slow-timeframe bin
+        df = calculate_indicators(df_raw.iloc[warm:min(hi + 1, n)], params)
+        df = df[df.index >= max(df_raw.index[lo], start)]
+        if hi < n:
+            df = df[df.index < df_raw.index[hi]]
+        if df.empty:
+            continue
+        new_rows = [_row_dict(ts, row) for ts, row in zip(df.index[-2:], df.iloc[-2:].to_dict('records'))]
+
+        # Prepend the previous chunk's last bar so crosses and open positions carry over
+        carried = bool(state['rows'])
+        if carried:
+            last = state['rows'][-1]
+            carry_df = pd.DataFrame([{k: last[k] for k in ('Close', 'MA', 'RSI_D', 'RSI_W')}],
+                                    index=pd.DatetimeIndex([pd.Timestamp(last['date'])]))
+            df = pd.concat([carry_df, df])
+        curve, trades, win_count, _ = _backtest_vectorized(df, params, 'columnar', carry=state)
+        if carried:
+            curve = {k: v[1:] for k, v in curve.items()}
+
+        # Running metrics (cent-rounded equity, like summarize)
+        eq = np.round(curve['equity'], 2)
+        running_max = np.maximum.accumulate(eq)
+        if state['peak'] is not None:
+            running_max = np.maximum(running_max, state['peak'])
+        state['mdd'] = min(state['mdd'], float(((eq - running_max) / running_max).min()))
+        state['peak'] = float(running_max[-1])
+        if state['first_date'] is None:
+            state['first_date'] = pd.Timestamp(curve['date'][0]).isoformat()
+            state['first_price'] = float(curve['price'][0])
+        if not state['first_buy_price']:
+            state['first_buy_price'] = next((t['price'] for t in trades if t['type'] == 'Buy'), 0.0)
+        state['equity'] = float(curve['equity'][-1])
+        state['win_count'] += win_count
+        state['trades'].extend(trades)
+        state['rows'] = (state['rows'] + new_rows)[-2:]
+        state['bars'] += len(eq)
+        state['chunks'] += 1
+        yield curve, trades, state
+
+def backtest_chunked(df_raw, params=None, chunk_bars=CHUNK_BARS, symbol=SYMBOL, on_chunk=None):
+    # Same metrics as summarize() without ever holding the full curve;
+    # on_chunk(curve) gets each columnar curve chunk (e.g. to append it to disk)
+    if params is None:
+        params = DEFAULT_PARAMS
+    state = new_chunk_state()
+    for curve, _, state in iter_backtest_chunks(df_raw, params, chunk_bars, state):
+        if on_chunk is not None:
+            on_chunk(curve)
+    if not state['bars']:
+        return {"error": "Not enough data"}
+
+    first, last = pd.Timestamp(state['first_date']), pd.Timestamp(state['rows'][-1]['date'])
+    fmt = _date_format(pd.DatetimeIndex([first, last]))
+    final_val = round(state['equity'], 2)
+    years = (last - first).days / 365.25
+    cagr = (final_val / INITIAL_CAPITAL) ** (1 / years) - 1 if years > 0 else 0
+    trades = state['trades']
+    total_trades = len([t for t in trades if t['type'] == 'Sell'])
+    win_rate = (state['win_count'] / total_trades * 100) if total_trades > 0 else 0
+    final_price = state['rows'][-1]['Close']
+    bnh_start = (INITIAL_CAPITAL / state['first_price']) * final_price if state['first_price'] > 0 else 0
+    bnh_first_buy = (INITIAL_CAPITAL / state['first_buy_price']) * final_price if state['first_buy_price'] > 0 else 0
+    rows = state['rows']
+    return {
+        "symbol": symbol,
+        "start_date": first.strftime(fmt),
+        "last_date": last.strftime(fmt),
+        "final_balance": round(final_val, 0),
+        "bnh_start": round(bnh_start if bnh_start == bnh_start else 0, 0),
+        "bnh_first_buy": round(bnh_first_buy if bnh_first_buy == bnh_first_buy else 0, 0),
+        "initial_capital": INITIAL_CAPITAL,
+        "cagr": round(cagr * 100, 2),
+        "mdd": round(state['mdd'] * 100, 2),
+        "total_trades": total_trades,
+        "win_count": state['win_count'],
+        "win_rate": round(win_rate, 1),
+        "diagnosis": diagnose(rows[-1], rows[-2], params, state['in_pos']) if len(rows) > 1 else None,
+        "trades": trades[::-1], # Newest first
+        "equity_curve": None,
+        "bars": state['bars'],
+        "chunks": state['chunks'],
+    }
+
+
+# =========================================================
+# 🧮 BATCH BACKTEST (N parameter sets, one pass over time)
+# =========================================================
+# Threshold params only: ma_period / d_period / w_period shape the indicator
+# table itself, so one table is shared by every row of the batch.
+BATCH_PARAM_COLS = ['w_buy_max', 'd_buy_cross', 'w_sell_cross', 'w_profit_max', 'stop_loss']
+
+def param_grid(**ranges):
+    # param_grid(w_buy_max=range(50, 70), stop_loss=[0.1, 0.2], ...) -> DataFrame
+    # Missing columns fall back to DEFAULT_PARAMS.
+    values = [list(ranges.get(c, [DEFAULT_PARAMS[c]])) for c in BATCH_PARAM_COLS]
+    mesh = np.meshgrid(*values, indexing='ij')
+    return pd.DataFrame({c: m.ravel() for c, m in zip(BATCH_PARAM_COLS, mesh)})
+
+def _param_table(param_sets):
+    if isinstance(param_sets, pd.DataFrame):
+        return param_sets[BATCH_PARAM_COLS].to_numpy(dtype='float64')
+    return np.asarray(param_sets, dtype='float64').reshape(-1, len(BATCH_PARAM_COLS))
+
+def signal_arrays(prices, ma_vals, rsi_d, rsi_w, table):
+    # Entry / exit signals that don't depend on the position, for every bar at
+    # once: (bars x N) bools, N = rows of the threshold table. Row i compares
+    # bar i with bar i - 1; row 0 never trades. Stop loss needs the entry price,
+    # so it stays in the caller's loop.
+    w_buy_max, d_buy_cross, w_sell_cross, w_profit_max, _ = table.T
+    def col(x):
+        return x[:, None] if x.ndim == 1 else x
+    is_uptrend = (col(prices) > col(ma_vals))[1:]
+    rw, rd = col(rsi_w), col(rsi_d)
+    n_sets = len(table)
+    buy_sig = np.zeros((len(prices), n_sets), dtype=bool)
+    exit_sig = np.zeros((len(prices), n_sets), dtype=bool)
+    exit_sig[1:] = (rw[1:] >= w_profit_max) | ((rw[:-1] > w_sell_cross) & (rw[1:] <= w_sell_cross)) | ~is_uptrend
+    buy_sig[1:] = is_uptrend & (rw[1:] < w_buy_max) & (rd[:-1] < d_buy_cross) & (rd[1:] >= d_buy_cross)
+    return buy_sig, exit_sig
+
+def batch_kernel(prices, dates, ma_vals, rsi_d, rsi_w, table, first=None):
+    # Price and indicator arrays are (bars,) when every set shares them, or
+    # (bars, N) with one column per set (e.g. Monte Carlo paths). first[j] is the
+    # first backtest bar of set j (default 0); like bar 0 of get_strategy_data it
+    # never trades, and bars before it are idle.
+    stop_loss = table[:, BATCH_PARAM_COLS.index('stop_loss')]
+    n_sets = len(table)
+
+    # Per-parameter-set state vectors
+    in_pos = np.zeros(n_sets, dtype=bool)
+    shares = np.zeros(n_sets)
+    balance = np.full(n_sets, float(INITIAL_CAPITAL))
+    entry = np.zeros(n_sets)
+    trade_count = np.zeros(n_sets, dtype=np.int64)
+    win_count = np.zeros(n_sets, dtype=np.int64)
+    peak = balance.copy()
+    mdd = np.zeros(n_sets)
+
+    buy_sig, exit_sig = signal_arrays(prices, ma_vals, rsi_d, rsi_w, table)
+    if first is not None:
+        buy_sig &= np.asarray(first)[None, :] < np.arange(len(prices))[:, None]
+
+    for i in range(1, len(prices)):
+        price = prices[i]
+
+        # Sell (evaluated on positions held at the start of the bar)
+        sell = None
+        if in_pos.any():
+            ref_price = np.where(entry > 0, entry, price)
+            sell = (price - ref_price) / ref_price < -stop_loss
+            sell |= exit_sig[i]
+            sell &= in_pos
+
+        # Buy (only possible in an uptrend)
+        buy = ~in_pos & buy_sig[i]
+
+        if sell is not None and sell.any():
+            idx = np.flatnonzero(sell)
+            px = price[idx] if price.ndim else price
+            balance[idx] = shares[idx] * px
+            win_count[idx] += px > entry[idx]
+            trade_count[idx] += 1
+            shares[idx] = 0
+            in_pos[idx] = False
+        if buy.any():
+            idx = np.flatnonzero(buy)
+            px = price[idx] if price.ndim else price
+            shares[idx] = balance[idx] / px
+            balance[idx] = 0
+            entry[idx] = px
+            in_pos[idx] = True
+
+        equity = np.where(in_pos, shares * price, balance)
+        np.maximum(peak, equity, out=peak)
+        np.minimum(mdd, (equity - peak) / peak, out=mdd)
+
+    final_val = np.where(in_pos, shares * prices[-1], balance) if len(prices) else balance
+    if first is None:
+        first = np.zeros(n_sets, dtype=np.int64)
+    years = np.zeros(n_sets)
+    if len(dates):
+        years = (dates[-1] - dates[first]).days.to_numpy() / 365.25
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(years > 0, (final_val / INITIAL_CAPITAL) ** (1 / years) - 1, 0.0)
+    win_rate = np.divide(win_count * 100.0, trade_count, out=np.zeros(n_sets), where=trade_count > 0)
+
+    result = pd.DataFrame(table, columns=BATCH_PARAM_COLS)
+    result['final_balance'] = final_val
+    result['cagr'] = cagr * 100
+    result['mdd'] = mdd * 100
+    result['total_trades'] = trade_count
+    result['win_count'] = win_count
+    result['win_rate'] = win_rate
+    return result
+
+def batch_backtest(df_bt, param_sets):
+    # df_bt: calculate_indicators() output already cut to the backtest start.
+    # param_sets: DataFrame with BATCH_PARAM_COLS, or an (N x 5) array in that order.
+    # Metrics follow get_strategy_data, but equity is not rounded to cents per bar,
+    # so CAGR/MDD can differ from it in the last decimals.
+    return batch_kernel(
+        df_bt['Close'].to_numpy(dtype='float64'),
+        df_bt.index,
+        df_bt['MA'].to_numpy(dtype='float64'),
+        df_bt['RSI_D'].to_numpy(dtype='float64'),
+        df_bt['RSI_W'].to_numpy(dtype='float64'),
+        _param_table(param_sets),
+    )
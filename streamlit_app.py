@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import time
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import strategy_core
+import downsample
+import trade_log
+import monte_carlo
+import prewarm
 from datetime import datetime
 
 # =========================================================
@@ -242,6 +248,14 @@ with st.sidebar:
     start_date_input = st.date_input("Start Date", value=datetime(2010, 2, 1), min_value=min_date, max_value=max_date)
     start_date_str = start_date_input.strftime("%Y-%m-%d")
 
+    # Data Source (see providers.py): offline sources skip the network entirely
+    provider_names = list(strategy_core.providers.PROVIDERS)
+    source = st.selectbox("Data Source", provider_names, index=provider_names.index(strategy_core.providers.DEFAULT_PROVIDER))
+    if source == 'local':
+        source = 'local:' + st.text_input("Data Directory", value=strategy_core.providers.DATA_DIR)
+    elif source == 'synthetic':
+        source = f"synthetic:{int(st.number_input('Synthetic Seed', value=0, step=1))}"
+
     st.markdown("---")
     
     # Sliders using custom markdown for styling "Default" text
@@ -264,9 +278,91 @@ with st.sidebar:
     if st.button("Reset to Defaults", type="primary"):
         st.rerun()
 
+    st.markdown("---")
+
+    # Chart rendering: WebGL traces downsampled to about the chart's pixel width
+    fast_charts = st.toggle("Fast Charts (WebGL)", value=True, help="Downsample long histories and draw with WebGL. Drag a box on the price chart to zoom in with full detail.")
+    chart_points = st.number_input("Chart Points", min_value=500, max_value=10000, value=2000, step=500, disabled=not fast_charts)
+    ds_method = st.selectbox("Downsampling", downsample.METHODS, disabled=not fast_charts)
+
 # =========================================================
 # 🧠 STRATEGY EXECUTION
 # =========================================================
+# Staged pipeline, each stage cached on only its own inputs:
+#   prices     <- symbol, start date, data source
+#   indicators <- + MA / RSI periods
+#   strategy   <- + thresholds (backtest + metrics/diagnosis)
+# A threshold slider therefore only re-runs the backtest. Entries expire with
+# the price cache TTL so new bars show up after the market data refreshes.
+DATA_TTL = strategy_core.price_cache.CACHE_TTL
+
+# Stage timings only record real (cache-miss) runs; see the Performance panel.
+@st.cache_data(ttl=DATA_TTL, show_spinner=False, max_entries=16)
+def load_prices(symbol, start_date, source):
+    with strategy_core.stage_timer('fetch', symbol=symbol) as rec:
+        return strategy_core.get_data(symbol, start_date, info=rec, provider=source)
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False, max_entries=64)
+def load_indicators(symbol, start_date, source, ma_period, d_period, w_period):
+    df_raw = load_prices(symbol, start_date, source)
+    if df_raw.empty:
+        return df_raw
+    with strategy_core.stage_timer('indicators') as rec:
+        df = strategy_core.calculate_indicators(df_raw, {'ma_period': ma_period, 'd_period': d_period, 'w_period': w_period})
+        rec['rows'] = len(df)
+    return df
+
+# After-close pre-warm of the watchlist's default backtests (prewarm.py), one
+# scheduler thread per server process; TQ_PREWARM=0 turns it off
+@st.cache_resource
+def start_prewarm():
+    return prewarm.start_background() if prewarm.ENABLED else None
+
+start_prewarm()
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False, max_entries=256)
+def load_strategy(symbol, param_items, source):
+    p = dict(param_items)
+    timings = []
+    df_raw = load_prices(symbol, p['start_date'], source)
+    # Pre-warmed (or computed by any other caller in this process) for the same data
+    with strategy_core.stage_timer('result_cache', timings) as rec:
+        hit = strategy_core.lookup_result(symbol, p, df_raw, engine='vectorized', output='columnar')
+        rec['hit'] = hit is not None
+    if hit is not None:
+        return {**hit, "trade_log": trade_log.trades_frame(hit['trades']), "timings": timings}
+
+    df = load_indicators(symbol, p['start_date'], source, *[p[k] for k in strategy_core.INDICATOR_KEYS])
+    if df.empty:
+        return {"error": "Failed to download data"}
+    if df.index[-1] < pd.to_datetime(p['start_date']):
+        return {"error": "Not enough data"}
+    with strategy_core.stage_timer('backtest', timings, engine='vectorized', output='columnar') as rec:
+        bt = strategy_core.run_backtest(df, p, engine='vectorized', output='columnar')
+        rec.update(rows=len(bt['df_bt']), trades=len(bt['trades']))
+    with strategy_core.stage_timer('summarize', timings):
+        result = strategy_core.summarize(symbol, df, bt, p)
+    # Shared with the API / scanner / pre-warm through the process-wide result cache
+    strategy_core.store_result(symbol, p, df_raw, result, engine='vectorized', output='columnar')
+    result['trade_log'] = trade_log.trades_frame(result['trades'])
+    result['timings'] = timings
+    return result
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False, max_entries=32)
+def trade_log_file(symbol, param_items, source, fmt):
+    # Download payload for the full trade log, built once per result
+    log = load_strategy(symbol, param_items, source)['trade_log']
+    return trade_log.to_parquet_bytes(log) if fmt == 'parquet' else trade_log.to_csv_bytes(log)
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False, max_entries=8)
+def load_monte_carlo(symbol, param_items, source, n_paths, block_len, seed):
+    p = dict(param_items)
+    df_raw = load_prices(symbol, p['start_date'], source)
+    with strategy_core.stage_timer('monte_carlo', paths=n_paths, block_len=block_len) as rec:
+        out = monte_carlo.monte_carlo(symbol, p, n_paths, block_len, seed, df=df_raw)
+        rec['rows'] = len(df_raw)
+    return out
+
 params = {
     'ma_period': ma_period,
     'd_period': 3, # Fixed as per original code
@@ -281,8 +377,9 @@ params = {
 
 with st.spinner('Calculating Strategy...'):
     try:
-        data = strategy_core.get_strategy_data(symbol, params)
-        if not data:
+        param_items = tuple(sorted(params.items()))
+        data = load_strategy(symbol, param_items, source)
+        if not data or 'error' in data:
             st.error("No data returned. Please check the symbol and start date.")
             st.stop()
     except Exception as e:
@@ -298,7 +395,7 @@ with st.spinner('Calculating Strategy...'):
 
 # Diagnosis Keys Map
 diag = data['diagnosis']
-current_date = data['equity_curve'][-1]['date']
+current_date = data['last_date']
 
 html_stats = f"""
 <!-- Row 1: Market Info -->
@@ -366,7 +463,10 @@ html_stats = f"""
 """
 
 # Extract last 30 days status
-recent_curve = data['equity_curve'][-35:] # Get a bit more, user said approx 30
+# Columnar curve: NumPy arrays keyed by field (see strategy_core.OUTPUT_MODES)
+eq_data = data['equity_curve']
+recent_dates = pd.DatetimeIndex(eq_data['date'][-35:]).strftime("%Y-%m-%d") # Get a bit more, user said approx 30
+recent_status = eq_data['s'][-35:].tolist()
 # Mapping: 0=Bear, 1=Wait, 2=Buy, 3=Hold, 4=Profit, 5/6=Sell
 # Note: Strategy Core 's' values: 0=Bear, 1=Wait/Bull, 2=Buy, 3=Hold, 4=Profit, 5=Stop, 6=Break
 status_map = {
@@ -380,10 +480,8 @@ status_map = {
 }
 
 hist_html = ""
-for day in recent_curve:
-    s = day.get('s', 1)
+for date_str, s in zip(recent_dates, recent_status):
     icon = status_map.get(s, "❓")
-    date_str = day['date']
     # Tooltip with date
     hist_html += f"<div class='hist-item' title='{date_str}'>{icon}</div>"
 
@@ -414,6 +512,17 @@ html_stats += hist_html + "</div>" + f"""
 """
 st.markdown(html_stats, unsafe_allow_html=True)
 
+# Data freshness: last cached bar / download time (network sources) and the last pre-warm
+fresh = prewarm.freshness(symbol)
+as_of = [f"Data as of {current_date}"]
+if fresh['fetched_at'] and strategy_core.providers.get_provider(source)['cacheable']:
+    as_of.append(f"downloaded {datetime.fromtimestamp(fresh['fetched_at']):%Y-%m-%d %H:%M}")
+if fresh['warmed_at']:
+    as_of.append(f"pre-warmed {datetime.fromtimestamp(fresh['warmed_at']):%Y-%m-%d %H:%M}")
+if data.get('timings') and data['timings'][0].get('hit'):
+    as_of.append("served from the result cache")
+st.caption(" · ".join(as_of))
+
 st.markdown("---")
 
 # 2. SECONDARY STATS & CONDITIONS
@@ -463,23 +572,49 @@ st.write("") # Spacer
 
 # --- CHART 1: TECHNICAL ANALYSIS ---
 st.subheader("Technical Analysis")
-
-# Convert date strings back to datetime objects for Plotly if needed, 
-# but Plotly handles ISO strings well.
-# EXTRACT DATA FROM EQUITY CURVE
-eq_data = data['equity_curve']
-dates = [e['date'] for e in eq_data]
-closes = [e['price'] for e in eq_data]
-ma_line = [e['ma'] for e in eq_data]
-equity_vals = [e['equity'] for e in eq_data]
+render_t0 = time.perf_counter()
+
+# Plotly takes the datetime64 / float arrays of the columnar curve as-is
+dates = eq_data['date']
+closes = eq_data['price']
+ma_line = eq_data['ma']
+equity_vals = eq_data['equity']
+
+# Fast mode: WebGL traces, each series downsampled to ~chart_points, and a box
+# selection on the price chart zooms in by re-slicing the full-resolution curve
+# (so the detail comes back). A new chart key clears the selection.
+Scatter = go.Scattergl if fast_charts else go.Scatter
+zoom_key = f"tech_chart_{st.session_state.get('zoom_reset', 0)}"
+view = slice(None)
+if fast_charts:
+    box = ((st.session_state.get(zoom_key) or {}).get('selection') or {}).get('box') or []
+    if box and len(box[0].get('x', [])) >= 2:
+        x0, x1 = sorted(np.datetime64(pd.Timestamp(x), 'ns') for x in box[0]['x'][:2])
+        lo, hi = np.searchsorted(dates, x0), np.searchsorted(dates, x1, side='right')
+        if hi - lo > 1:
+            view = slice(lo, hi)
+            z1, z2 = st.columns([4, 1], vertical_alignment="center")
+            zoom_fmt = "%Y-%m-%d %H:%M" if ':' in current_date else "%Y-%m-%d"
+            z1.caption(f"Zoomed: {pd.Timestamp(dates[lo]).strftime(zoom_fmt)} → {pd.Timestamp(dates[hi - 1]).strftime(zoom_fmt)} ({hi - lo:,} bars)")
+            if z2.button("Reset Zoom"):
+                st.session_state['zoom_reset'] = st.session_state.get('zoom_reset', 0) + 1
+                st.rerun()
+view_start, view_end = dates[view][0], dates[view][-1]
+
+def chart_xy(values):
+    # Visible window of a full-length series, downsampled in fast mode
+    x, y = dates[view], values[view]
+    return downsample.downsample(x, y, chart_points, ds_method) if fast_charts else (x, y)
 
 fig_tech = make_subplots(rows=2, cols=1, shared_xaxes=True, 
                          vertical_spacing=0.05, row_heights=[0.7, 0.3])
 
 # Price Candle (Approximated with Line + Fill or just Line for simplicity as backend sends arrays)
-fig_tech.add_trace(go.Scatter(x=dates, y=closes, mode='lines', name='Price', line=dict(color='#c9d1d9', width=1)), row=1, col=1)
+px_x, px_y = chart_xy(closes)
+fig_tech.add_trace(Scatter(x=px_x, y=px_y, mode='lines', name='Price', line=dict(color='#c9d1d9', width=1)), row=1, col=1)
 # MA Line: User requested "Dark Color". Using a dimmed gray-blue.
-fig_tech.add_trace(go.Scatter(x=dates, y=ma_line, mode='lines', name=f'MA({ma_period})', line=dict(color='#3d444d', width=1.5)), row=1, col=1)
+ma_x, ma_y = chart_xy(ma_line)
+fig_tech.add_trace(Scatter(x=ma_x, y=ma_y, mode='lines', name=f'MA({ma_period})', line=dict(color='#3d444d', width=1.5)), row=1, col=1)
 
 # Add Trades (Buy/Sell Markers)
 trades = data['trades'] 
@@ -491,9 +626,15 @@ buy_y = []
 sell_x = []
 sell_y = []
 sell_count = 0
+# Fast mode: profit labels go into one text trace instead of N annotations
+label_y = []
+label_text = []
+label_color = []
 
 # Process events for markers
 for t in trades:
+    if not (view_start <= np.datetime64(t['date'], 'ns') <= view_end):
+        continue
     if t['type'] == 'Buy':
         buy_x.append(t['date'])
         buy_y.append(t['price'])
@@ -509,7 +650,12 @@ for t in trades:
         offset_levels = [-30, -60, -90]
         y_offset = offset_levels[sell_count % 3]
         sell_count += 1
-        
+
+        if fast_charts:
+            label_y.append(t['price'] * (1 - y_offset / 1000))
+            label_text.append(f"{profit_pct:.1f}%")
+            label_color.append(profit_color)
+            continue
         fig_tech.add_annotation(
             x=t['date'], y=t['price'],
             text=f"{profit_pct:.1f}%",
@@ -517,14 +663,20 @@ for t in trades:
             font=dict(color=profit_color, size=14, family="Arial Black") # Larger font
         )
 
+if label_text:
+    fig_tech.add_trace(Scatter(
+        x=sell_x, y=label_y, mode='text', text=label_text, textposition='top center',
+        textfont=dict(color=label_color, size=14, family="Arial Black"), hoverinfo='skip', showlegend=False
+    ), row=1, col=1)
+
 # Buy Markers
-fig_tech.add_trace(go.Scatter(
+fig_tech.add_trace(Scatter(
     x=buy_x, y=buy_y, mode='markers', name='Buy',
     marker=dict(symbol='triangle-up', size=10, color='#3fb950')
 ), row=1, col=1)
 
 # Sell Markers
-fig_tech.add_trace(go.Scatter(
+fig_tech.add_trace(Scatter(
     x=sell_x, y=sell_y, mode='markers', name='Sell',
     marker=dict(symbol='triangle-down', size=10, color='#f85149')
 ), row=1, col=1)
@@ -560,7 +712,12 @@ fig_tech.update_layout(
         font=dict(color="white") # Legend Text White
     )
 )
-st.plotly_chart(fig_tech, use_container_width=True)
+if fast_charts:
+    # Drag = box select -> detail zoom (see above)
+    fig_tech.update_layout(dragmode='select')
+    st.plotly_chart(fig_tech, use_container_width=True, key=zoom_key, on_select="rerun", selection_mode="box")
+else:
+    st.plotly_chart(fig_tech, use_container_width=True)
 
 # --- CHART 2: EQUITY CURVE ---
 st.subheader("Equity Curve")
@@ -568,12 +725,12 @@ st.subheader("Equity Curve")
 fig_equity = go.Figure()
 
 # Calculate B&H (1st Buy) Curve
-bnh_values = [None] * len(dates) # Default to None
+bnh_values = np.full(len(dates), np.nan) # Default to gap
 first_buy_price = 0
 start_idx = -1
 
 # Find first buy date from trades
-# We need to match trade dates to our 'dates' list
+# We need to match trade dates to our 'dates' array
 # 'trades' is a list of dicts. We find the earliest 'Buy' type.
 # Assuming trades are chronological or we sort them.
 # Let's verify trade order or just find the min date.
@@ -583,29 +740,31 @@ if buy_trades:
     first_buy = min(buy_trades, key=lambda x: x['date']) # Ensure we get the very first
     start_date = first_buy['date']
     
-    # Find index in dates list
-    if start_date in dates:
-        start_idx = dates.index(start_date)
+    # Find index in dates array
+    match = np.flatnonzero(dates == np.datetime64(start_date))
+    if len(match):
+        start_idx = int(match[0])
         first_buy_price = closes[start_idx]
         
         # Calculate B&H series starting from this index
         # align with strategy's starting capital (usually 1st equity value)
-        initial_cap = equity_vals[0] if equity_vals else 10000
+        initial_cap = equity_vals[0] if len(equity_vals) else 10000
         shares = initial_cap / first_buy_price
         
-        for i in range(start_idx, len(dates)):
-            bnh_values[i] = shares * closes[i]
+        bnh_values[start_idx:] = shares * closes[start_idx:]
 
 # Add B&H Trace (Dark/Dimmed)
-fig_equity.add_trace(go.Scatter(
-    x=dates, y=bnh_values, 
+bnh_x, bnh_y = chart_xy(bnh_values)
+fig_equity.add_trace(Scatter(
+    x=bnh_x, y=bnh_y, 
     mode='lines', 
     name='B&H (1st Buy)', 
     line=dict(color='#e3b341', width=1.5) # Solid Yellow Line
 ))
 
 # Add Strategy Equity Trace (Blue)
-fig_equity.add_trace(go.Scatter(x=dates, y=equity_vals, mode='lines', name='Equity', line=dict(color='#58a6ff', width=2)))
+eq_x, eq_y = chart_xy(equity_vals)
+fig_equity.add_trace(Scatter(x=eq_x, y=eq_y, mode='lines', name='Equity', line=dict(color='#58a6ff', width=2)))
 fig_equity.update_layout(
     height=400, 
     template="plotly_dark", 
@@ -632,6 +791,37 @@ st.plotly_chart(fig_equity, use_container_width=True)
 # =========================================================
 st.subheader("Recent Trades")
 if trades:
+    # Columnar log (cached with the strategy result); filter / sort / paginate
+    # here and only turn the visible page into HTML
+    log = data['trade_log']
+    date_fmt = "%Y-%m-%d %H:%M" if ':' in current_date else "%Y-%m-%d"
+    max_days = int(log['holding_days'].max()) if log['holding_days'].notna().any() else 0
+
+    f1, f2, f3, f4 = st.columns([1, 2, 1, 2])
+    with f1:
+        log_types = st.multiselect("Type", ['Buy', 'Sell'], default=['Buy', 'Sell'])
+    with f2:
+        log_reasons = st.multiselect("Reason", list(log['reason'].cat.categories), help="Exit filters (reason, result, holding days) only keep Sell rows")
+    with f3:
+        log_sign = st.selectbox("Result", trade_log.PROFIT_SIGNS)
+    with f4:
+        log_days = st.slider("Holding Days", 0, max(max_days, 1), (0, max(max_days, 1)))
+    s1, s2, s3, s4 = st.columns([2, 1, 1, 1], vertical_alignment="bottom")
+    with s1:
+        log_sort = st.selectbox("Sort By", trade_log.SORT_COLS)
+    with s2:
+        log_desc = st.toggle("Descending", value=True)
+    with s3:
+        page_size = st.selectbox("Rows", [25, 50, 100, 250])
+
+    days_filter = None if log_days == (0, max(max_days, 1)) else log_days
+    view_log = trade_log.filter_trades(log, log_types, log_reasons, log_sign, days_filter)
+    view_log = trade_log.sort_trades(view_log, log_sort, log_desc)
+    with s4:
+        page_no = st.number_input("Page", min_value=1, value=1, step=1)
+    rows, n_pages = trade_log.page(view_log, page_no, page_size)
+    st.caption(f"{len(view_log):,} of {len(log):,} trades · page {min(page_no, n_pages)} / {n_pages}")
+
     # Custom HTML Table (Styles moved to global CSS)
     
     # Header
@@ -648,19 +838,19 @@ if trades:
         <tbody>
     """
     
-    for t in trades:
-        t_type = t['type']
-        t_date = t['date']
-        t_price = f"${t['price']:,.2f}"
+    for t in rows.itertuples(index=False):
+        t_type = t.type
+        t_date = t.date.strftime(date_fmt)
+        t_price = f"${t.price:,.2f}"
         
         type_class = "type-buy" if t_type == "Buy" else "type-sell"
         info_html = ""
         
         if t_type == "Sell":
-            profit = t.get('profit_pct', 0)
+            profit = t.profit_pct
             p_class = "profit-pos" if profit > 0 else "profit-neg"
-            days = t.get('holding_days', 0)
-            reason = t.get('reason', '')
+            days = t.holding_days
+            reason = t.reason
             info_html = f"<span class='{p_class}'>{profit:+.1f}%</span> <span style='color:#666'>({days}d)</span> <span style='font-size:0.8em; color:#8b949e'>{reason}</span>"
         else:
             info_html = "<span style='color: #444'>Entry</span>"
@@ -671,5 +861,75 @@ if trades:
         
     html_table += "</tbody></table>"
     st.markdown(html_table, unsafe_allow_html=True)
+
+    # Full (unfiltered) log
+    d1, d2, _ = st.columns([1, 1, 4])
+    with d1:
+        st.download_button("⬇️ CSV", trade_log_file(symbol, param_items, source, 'csv'),
+                           file_name=f"{symbol}_trades.csv", mime="text/csv")
+    with d2:
+        st.download_button("⬇️ Parquet", trade_log_file(symbol, param_items, source, 'parquet'),
+                           file_name=f"{symbol}_trades.parquet", mime="application/octet-stream")
 else:
     st.info("No trades found.")
+
+strategy_core.record_timing({"stage": "render", "seconds": time.perf_counter() - render_t0,
+                             "rows": len(dates), "trades": len(trades)})
+
+# =========================================================
+# 🎲 ROBUSTNESS (Monte Carlo)
+# =========================================================
+with st.expander("🎲 Robustness (Monte Carlo)"):
+    st.caption("Runs the current parameters on block-bootstrapped resamples of the price history")
+    m1, m2, m3, m4 = st.columns([1, 1, 1, 1], vertical_alignment="bottom")
+    with m1:
+        mc_paths = st.number_input("Paths", min_value=100, max_value=10000, value=monte_carlo.N_PATHS, step=500)
+    with m2:
+        mc_block = st.number_input("Block (bars)", min_value=1, max_value=250, value=monte_carlo.BLOCK_LEN)
+    with m3:
+        mc_seed = st.number_input("Seed", min_value=0, value=0, step=1)
+    mc_key = (symbol, param_items, source, int(mc_paths), int(mc_block), int(mc_seed))
+    with m4:
+        if st.button("Run", use_container_width=True):
+            st.session_state['mc_key'] = mc_key
+
+    # Results stay up until an input changes; the run itself is cached
+    if st.session_state.get('mc_key') == mc_key:
+        with st.spinner(f"Simulating {int(mc_paths):,} paths..."):
+            mc = load_monte_carlo(*mc_key)
+        if 'error' in mc:
+            st.error(mc['error'])
+        else:
+            summary = mc['summary']
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric("Historical CAGR", f"{mc['actual']['cagr']:.1f}%")
+            k2.metric("Median CAGR", f"{summary.loc['cagr', 'p50']:.1f}%")
+            k3.metric("P(CAGR < 0)", f"{mc['prob_loss']:.1f}%")
+            k4.metric("P(Worse MDD)", f"{mc['prob_worse_mdd']:.1f}%")
+
+            fig_mc = go.Figure()
+            fig_mc.add_trace(go.Histogram(x=mc['paths']['cagr'], nbinsx=60, marker_color='#58a6ff', name='CAGR'))
+            fig_mc.add_vline(x=mc['actual']['cagr'], line=dict(color='#e3b341', width=2, dash='dash'),
+                             annotation_text="Historical", annotation_font_color='#e3b341')
+            fig_mc.update_layout(
+                height=280,
+                template="plotly_dark",
+                margin=dict(l=0, r=0, t=10, b=0),
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(title="CAGR (%)", showgrid=True, gridcolor='#21262d'),
+                yaxis=dict(title="Paths", showgrid=True, gridcolor='#21262d'),
+                showlegend=False,
+            )
+            st.plotly_chart(fig_mc, use_container_width=True)
+            st.dataframe(summary.round(2), use_container_width=True)
+
+# =========================================================
+# ⏱️ PERFORMANCE
+# =========================================================
+with st.expander("⏱️ Performance"):
+    # Cached stages don't re-run, so 'last run' can be older than this page view
+    st.caption("Last computed run of this result")
+    st.dataframe(pd.DataFrame(data.get('timings', [])), use_container_width=True, hide_index=True)
+    st.caption(f"Rolling per-stage latency (last {strategy_core.TIMING_WINDOW} runs, this server process)")
+    st.dataframe(strategy_core.timing_stats().round(2), use_container_width=True, hide_index=True)
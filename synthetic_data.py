@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 🎲 SYNTHETIC PRICE SERIES (offline tests / benchmarks)
+# =========================================================
+# Deterministic for a given seed. Output has the same shape as get_data():
+# a tz-naive, sorted 'Close' frame.
+
+TRADING_DAYS = 252
+
+
+def _index(n_bars, start, freq):
+    if freq is None:
+        # Business days until the calendar would pass pandas' Timestamp range
+        freq = 'B' if n_bars <= 50_000 else 'h'
+    return pd.date_range(start, periods=n_bars, freq=freq)
+
+def session_index(n_sessions, start='2000-01-03', minutes=60, open_time='09:30', session_minutes=390):
+    # Intraday bar start times: n business-day sessions of session_minutes each
+    days = pd.bdate_range(start, periods=n_sessions)
+    offsets = pd.Timedelta(open_time + ':00') + pd.to_timedelta(np.arange(0, session_minutes, minutes), unit='min')
+    return pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel())
+
+def gbm_returns(n_bars, mu=0.10, sigma=0.25, seed=0, periods_per_year=TRADING_DAYS):
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / periods_per_year
+    return np.exp((mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(n_bars)) - 1
+
+def gbm(n_bars, start_price=100.0, mu=0.10, sigma=0.25, seed=0, start='2000-01-03', freq=None,
+        periods_per_year=TRADING_DAYS):
+    rets = gbm_returns(n_bars, mu, sigma, seed, periods_per_year)
+    rets[0] = 0.0
+    close = start_price * np.cumprod(1 + rets)
+    return pd.DataFrame({'Close': close}, index=_index(n_bars, start, freq))
+
+def lever(rets, leverage=3.0, expense=0.0095, periods_per_year=TRADING_DAYS):
+    # Daily-reset leverage: every bar's underlying return times `leverage`, minus fees
+    return np.maximum(leverage * rets - expense / periods_per_year, -0.99)
+
+def leveraged(n_bars, leverage=3.0, start_price=50.0, mu=0.10, sigma=0.22, expense=0.0095, seed=0,
+              start='2000-01-03', freq=None, periods_per_year=TRADING_DAYS):
+    # Daily-reset leveraged ETF path on a GBM underlying (TQQQ-like for the defaults)
+    rets = lever(gbm_returns(n_bars, mu, sigma, seed, periods_per_year), leverage, expense, periods_per_year)
+    rets[0] = 0.0
+    close = start_price * np.cumprod(1 + rets)
+    return pd.DataFrame({'Close': close}, index=_index(n_bars, start, freq))
+
+GENERATORS = {
+    'gbm': gbm,
+    'leveraged': leveraged,
+}
@@ -0,0 +1,60 @@
+import io
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 📋 TRADE LOG (columnar)
+# =========================================================
+# The trade events of get_strategy_data() as one DataFrame, with the
+# filter / sort / page helpers the dashboard runs server-side so only the
+# visible page is ever rendered.
+
+LOG_COLS = ['date', 'type', 'price', 'size', 'reason', 'balance', 'holding_days', 'profit_pct']
+SORT_COLS = ['date', 'price', 'profit_pct', 'holding_days', 'balance']
+PROFIT_SIGNS = ['All', 'Wins', 'Losses']
+
+
+def trades_frame(trades):
+    # trades: list of Buy / Sell dicts (any order) -> one row per event
+    df = pd.DataFrame(trades, columns=LOG_COLS)
+    df['date'] = pd.to_datetime(df['date'])
+    df['type'] = df['type'].astype('category')
+    df['reason'] = df['reason'].astype('category')
+    df['holding_days'] = df['holding_days'].astype('Int64')
+    return df
+
+def filter_trades(df, types=None, reasons=None, profit_sign='All', holding_days=None):
+    # reasons / profit_sign / holding_days describe exits, so they drop Buy rows
+    mask = np.ones(len(df), dtype=bool)
+    if types:
+        mask &= df['type'].isin(types).to_numpy()
+    if reasons:
+        mask &= df['reason'].isin(reasons).to_numpy()
+    if profit_sign == 'Wins':
+        mask &= (df['profit_pct'] > 0).fillna(False).to_numpy()
+    elif profit_sign == 'Losses':
+        mask &= (df['profit_pct'] <= 0).fillna(False).to_numpy()
+    if holding_days is not None:
+        lo, hi = holding_days
+        mask &= df['holding_days'].between(lo, hi).fillna(False).to_numpy(dtype=bool)
+    return df[mask]
+
+def sort_trades(df, by='date', descending=True):
+    if by not in SORT_COLS:
+        raise ValueError(f"Unknown sort column: {by}")
+    # Stable, so equal keys keep chronological order; missing values always last
+    return df.sort_values(by, ascending=not descending, kind='stable', na_position='last')
+
+def page(df, page_no, page_size):
+    # page_no is 1-based; returns (rows, page count)
+    pages = max(1, -(-len(df) // page_size))
+    page_no = min(max(1, page_no), pages)
+    return df.iloc[(page_no - 1) * page_size:page_no * page_size], pages
+
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+def to_parquet_bytes(df):
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
@@ -0,0 +1,80 @@
+import os
+import argparse
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import strategy_core
+
+# =========================================================
+# 🌐 MULTI-SYMBOL (UNIVERSE) RUNNER
+# =========================================================
+# One batched download for the whole list, then one get_strategy_data call
+# per symbol on a worker pool. A failing symbol only fills its own row's
+# 'error' column.
+
+UNIVERSE = ['TQQQ', 'SOXL', 'UPRO', 'QLD', 'TECL', 'SSO']
+SUMMARY_COLS = ['symbol', 'cagr', 'mdd', 'win_rate', 'total_trades', 'final_balance',
+                'active_status_id', 'status', 'last_date', 'error']
+DIAG_COLS = ['price', 'ma', 'rsi_w', 'rsi_d', 'message']
+
+
+def _run_one(symbol, df_raw, params, engine):
+    if df_raw is None or df_raw.empty:
+        return {"symbol": symbol, "error": "Failed to download data"}
+    data = strategy_core.get_strategy_data(symbol, params, engine=engine, df_raw=df_raw)
+    if 'error' in data:
+        return {"symbol": symbol, "error": data['error']}
+    return {
+        "symbol": symbol,
+        "cagr": data['cagr'],
+        "mdd": data['mdd'],
+        "win_rate": data['win_rate'],
+        "total_trades": data['total_trades'],
+        "final_balance": data['final_balance'],
+        "active_status_id": data['diagnosis']['active_status_id'],
+        "status": data['diagnosis']['status'],
+        "last_date": data['last_date'],
+        # Rest of the live diagnosis (not in SUMMARY_COLS; used by scan.py)
+        **{k: data['diagnosis'][k] for k in DIAG_COLS},
+        "error": None,
+    }
+
+def iter_universe(symbols=UNIVERSE, params=None, executor='process', max_workers=None, engine='vectorized', data=None,
+                  provider=None):
+    # Yields one summary row per symbol as soon as its backtest finishes.
+    # data: optional {symbol: price frame} to skip the download step.
+    # provider: providers.get_provider() spec, e.g. 'local:/data/prices' for big offline runs
+    if params is None:
+        params = strategy_core.DEFAULT_PARAMS
+    symbols = [s.upper() for s in symbols]
+    if data is None:
+        data = strategy_core.get_data_many(symbols, params.get('start_date', '2020-01-01'), provider=provider)
+
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    workers = max_workers or min(len(symbols), os.cpu_count() or 1) or 1
+    with pool_cls(max_workers=workers) as pool:
+        futures = {pool.submit(_run_one, s, data.get(s), params, engine): s for s in symbols}
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception as e:
+                yield {"symbol": futures[fut], "error": f"{type(e).__name__}: {e}"}
+
+def run_universe(symbols=UNIVERSE, params=None, **kwargs):
+    symbols = [s.upper() for s in symbols]
+    rows = {r['symbol']: r for r in iter_universe(symbols, params, **kwargs)}
+    # Keep the caller's symbol order
+    return pd.DataFrame([rows[s] for s in symbols], columns=SUMMARY_COLS)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backtest a list of symbols')
+    parser.add_argument('symbols', nargs='*', default=UNIVERSE)
+    parser.add_argument('--start', default=strategy_core.DEFAULT_PARAMS['start_date'])
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    params = dict(strategy_core.DEFAULT_PARAMS, start_date=args.start)
+    print(run_universe(args.symbols, params, executor=args.executor, max_workers=args.workers,
+                       provider=args.provider).to_string(index=False))
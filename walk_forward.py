@@ -0,0 +1,147 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+import strategy_core
+import indicator_bank
+import search
+
+# =========================================================
+# 🚶 WALK-FORWARD OPTIMIZATION
+# =========================================================
+# Indicators are computed once over the full history (indicator bank) and
+# every fold only slices it: train windows pick the best candidate with
+# search.evaluate, the following test window is traded with those params,
+# and the test windows are stitched into one out-of-sample equity curve.
+
+TRAIN_BARS = 756   # ~3 years
+TEST_BARS = 126    # ~6 months
+
+
+def make_folds(n_bars, start_idx, train_bars=TRAIN_BARS, test_bars=TEST_BARS, anchored=False):
+    # [(train_lo, train_hi, test_lo, test_hi)] as bar indices; hi is exclusive
+    folds = []
+    test_lo = start_idx + train_bars
+    while test_lo < n_bars:
+        test_hi = min(test_lo + test_bars, n_bars)
+        train_lo = start_idx if anchored else test_lo - train_bars
+        folds.append((train_lo, test_lo, test_lo, test_hi))
+        test_lo = test_hi
+    return folds
+
+def _params_of(row):
+    return {c: search._cast(row[c], c) for c in search.PARAM_COLS}
+
+def _run_window(bank, p, lo, hi):
+    # Trade bars lo..hi-1 with params p. Bar lo-1 is included as the backtest's
+    # "bar 0" (which never trades) so the first test bar can already trade.
+    dates = bank['Close'].index
+    frame = indicator_bank.indicators_from_bank(bank, p)
+    frame = frame[(frame.index >= dates[max(lo - 1, 0)]) & (frame.index <= dates[hi - 1])]
+    return strategy_core._backtest_vectorized(frame, p)
+
+def _metrics(dates, equity, initial):
+    equity = np.asarray(equity, dtype='float64')
+    if len(equity) == 0:
+        return 0.0, 0.0
+    years = (dates[-1] - dates[0]).days / 365.25
+    cagr = (equity[-1] / initial) ** (1 / years) - 1 if years > 0 else 0
+    peak = np.maximum.accumulate(equity)
+    mdd = ((equity - peak) / peak).min()
+    return round(float(cagr) * 100, 2), round(float(mdd) * 100, 2)
+
+def walk_forward(symbol=strategy_core.SYMBOL, params=None, train_bars=TRAIN_BARS, test_bars=TEST_BARS, anchored=False,
+                 candidates=None, n_candidates=500, objective=None, seed=None, df=None):
+    if params is None:
+        params = strategy_core.DEFAULT_PARAMS
+    start_date = params.get('start_date', '2020-01-01')
+    if df is None:
+        df = strategy_core.get_data(symbol, start_date)
+    if df.empty:
+        return {"error": "Failed to download data"}
+    objective = objective or search.make_objective()
+
+    bank = search.prepare(df, start_date)
+    if candidates is None:
+        candidates = search.sample_configs(n_candidates, np.random.default_rng(seed))
+        # The current params always compete too
+        base = pd.DataFrame([{c: params[c] for c in search.PARAM_COLS}])
+        candidates = pd.concat([base, candidates], ignore_index=True)
+
+    # Reference: plain backtest of `params` over the whole period (same as get_strategy_data)
+    full = indicator_bank.indicators_from_bank(bank, params)
+    full = full[full.index >= pd.to_datetime(start_date)]
+    equity_curve, _, _, _ = strategy_core._backtest_vectorized(full, params)
+
+    dates = bank['Close'].index
+    folds = []
+    oos_curve = []
+    capital = float(strategy_core.INITIAL_CAPITAL)
+    for k, (train_lo, train_hi, test_lo, test_hi) in enumerate(
+            make_folds(len(dates), bank['start_idx'], train_bars, test_bars, anchored)):
+        res = search.evaluate(bank, candidates, bars=(train_lo, train_hi))
+        res['score'] = objective(res)
+        best = res.loc[res['score'].idxmax()]
+        p = _params_of(best)
+
+        curve, trades, win_count, _ = _run_window(bank, p, test_lo, test_hi)
+        if not curve:
+            continue
+        # Each fold starts flat with the capital the previous fold ended with
+        scale = capital / strategy_core.INITIAL_CAPITAL
+        for rec in curve[0 if not oos_curve else 1:]:
+            oos_curve.append({"date": rec['date'], "equity": round(rec['equity'] * scale, 2), "s": rec['s'], "fold": k})
+        fold_start, capital = capital, oos_curve[-1]['equity']
+
+        folds.append({
+            "fold": k,
+            "train_start": dates[train_lo].strftime("%Y-%m-%d"),
+            "train_end": dates[train_hi - 1].strftime("%Y-%m-%d"),
+            "test_start": dates[test_lo].strftime("%Y-%m-%d"),
+            "test_end": dates[test_hi - 1].strftime("%Y-%m-%d"),
+            "params": p,
+            "train_cagr": round(float(best['cagr']), 2),
+            "train_mdd": round(float(best['mdd']), 2),
+            "test_return": round((capital / fold_start - 1) * 100, 2),
+            "test_trades": len([t for t in trades if t['type'] == 'Sell']),
+            "test_wins": win_count,
+        })
+
+    oos_dates = pd.to_datetime([e['date'] for e in oos_curve])
+    oos_cagr, oos_mdd = _metrics(oos_dates, [e['equity'] for e in oos_curve], strategy_core.INITIAL_CAPITAL)
+    is_cagr, is_mdd = _metrics(pd.to_datetime([e['date'] for e in equity_curve]), [e['equity'] for e in equity_curve],
+                               strategy_core.INITIAL_CAPITAL)
+    return {
+        "symbol": symbol,
+        "anchored": anchored,
+        "train_bars": train_bars,
+        "test_bars": test_bars,
+        "folds": folds,
+        "cagr": is_cagr,
+        "mdd": is_mdd,
+        "oos_cagr": oos_cagr,
+        "oos_mdd": oos_mdd,
+        "oos_final_balance": round(capital, 0),
+        "equity_curve": equity_curve,
+        "oos_equity_curve": oos_curve,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Walk-forward optimization')
+    parser.add_argument('symbol', nargs='?', default=strategy_core.SYMBOL)
+    parser.add_argument('--train', type=int, default=TRAIN_BARS)
+    parser.add_argument('--test', type=int, default=TEST_BARS)
+    parser.add_argument('--anchored', action='store_true')
+    parser.add_argument('--candidates', type=int, default=500)
+    parser.add_argument('--mdd-cap', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--provider', default=None, help="Data source: yfinance, local:<dir>, synthetic[:seed]")
+    args = parser.parse_args()
+
+    out = walk_forward(args.symbol.upper(), train_bars=args.train, test_bars=args.test, anchored=args.anchored,
+                       n_candidates=args.candidates, objective=search.make_objective(mdd_cap=args.mdd_cap), seed=args.seed,
+                       df=strategy_core.get_data(args.symbol, strategy_core.DEFAULT_PARAMS['start_date'], provider=args.provider))
+    if 'error' in out:
+        raise SystemExit(out['error'])
+    print(pd.DataFrame(out['folds']).drop(columns='params').to_string(index=False))
+    print(f"In-sample CAGR {out['cagr']}% / MDD {out['mdd']}%  |  OOS CAGR {out['oos_cagr']}% / MDD {out['oos_mdd']}%")